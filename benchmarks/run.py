@@ -0,0 +1,465 @@
+"""Benchmark suite for the Haptique RS90 Remote integration.
+
+Drives HaptiqueRS90Coordinator and every entity platform against an
+in-memory MQTT broker simulating an RS90 remote (no broker, no running
+Home Assistant instance), then writes a machine-readable JSON report.
+
+Scenarios:
+    startup     Retained lists + per-device command catalogs, measured until
+                the catalog is complete (wall time, handler CPU, entity writes)
+    key_storm   Burst of key presses (events fired, Last Key writes, CPU)
+    replay      Broker reconnect: every retained message delivered again
+                (should cause no entity write thanks to change detection)
+    macros      Macro triggers echoed back by the remote
+    recording   (--replay FILE) A record_traffic capture replayed as fast as possible
+    memory      Peak traced memory of a cold start
+
+Requires the homeassistant package (same version as the integration targets).
+
+Usage:
+    python benchmarks/run.py --devices 200 --commands 100 --macros 150 \
+        --keys 2000 --mode per_topic --output benchmarks/report.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import gc
+import inspect
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.components import mqtt  # noqa: E402
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity_registry as er  # noqa: E402
+
+from custom_components.haptique_rs90 import (  # noqa: E402
+    binary_sensor,
+    button,
+    sensor,
+    switch,
+)
+from custom_components.haptique_rs90.const import (  # noqa: E402
+    CONF_NAME,
+    CONF_REMOTE_ID,
+    CONF_SUBSCRIPTION_MODE,
+    DOMAIN,
+    TOPIC_BASE,
+)
+from custom_components.haptique_rs90.coordinator import HaptiqueRS90Coordinator  # noqa: E402
+from custom_components.haptique_rs90.traffic import async_replay  # noqa: E402
+
+REMOTE_ID = "bench0000000000000000000000000000"
+PLATFORMS = {
+    "button": button,
+    "sensor": sensor,
+    "binary_sensor": binary_sensor,
+    "switch": switch,
+}
+
+# Realistic command names: most of them repeat across devices
+COMMON_COMMANDS = (
+    "POWER", "POWER ON", "POWER OFF", "VOL+", "VOL-", "MUTE", "CH+", "CH-",
+    "UP", "DOWN", "LEFT", "RIGHT", "OK", "BACK", "HOME", "MENU", "INFO",
+    "PLAY", "PAUSE", "STOP", "0", "1", "2", "3", "4", "5", "6", "7", "8", "9",
+)
+
+
+@dataclass(slots=True)
+class FakeMessage:
+    """MQTT message as delivered to subscription callbacks."""
+
+    topic: str
+    payload: str | bytes
+    qos: int
+    retain: bool
+    subscribed_topic: str
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+def topic_matches(subscription: str, topic: str) -> bool:
+    """Return True if an MQTT topic matches a subscription filter."""
+    filter_levels = subscription.split("/")
+    topic_levels = topic.split("/")
+    for index, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels):
+            return False
+        if level not in ("+", topic_levels[index]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+class FakeBroker:
+    """In-memory broker with a simulated RS90 remote answering requests."""
+
+    def __init__(self, hass: HomeAssistant, catalog: dict[str, Any]) -> None:
+        """Initialize the broker."""
+        self.hass = hass
+        self.catalog = catalog
+        self.base = f"{TOPIC_BASE}/{REMOTE_ID}"
+        self.retained: dict[str, bytes] = {}
+        self.subscriptions: list[tuple[str, Any, str | None]] = []
+        self.delivered = 0
+        self.published = 0
+
+    def seed(self) -> None:
+        """Publish the retained state the remote keeps on the broker."""
+        self.retained[f"{self.base}/status"] = b"online"
+        self.retained[f"{self.base}/device/list"] = json.dumps(
+            [{"id": d["id"], "name": d["name"]} for d in self.catalog["devices"]]
+        ).encode()
+        self.retained[f"{self.base}/macro/list"] = json.dumps(
+            [{"id": m["id"], "name": m["name"]} for m in self.catalog["macros"]]
+        ).encode()
+        for device in self.catalog["devices"]:
+            self.retained[f"{self.base}/device/{device['name']}/commands"] = json.dumps(
+                device["commands"]
+            ).encode()
+        for macro in self.catalog["macros"]:
+            self.retained[f"{self.base}/macro/{macro['name']}/trigger"] = b"off"
+
+    async def async_subscribe(
+        self, hass, topic, msg_callback, qos=0, encoding="utf-8"
+    ):
+        """Subscribe (mqtt.async_subscribe stand-in)."""
+        subscription = (topic, msg_callback, encoding)
+        self.subscriptions.append(subscription)
+        for retained_topic, payload in list(self.retained.items()):
+            if topic_matches(topic, retained_topic):
+                self._deliver(subscription, retained_topic, payload, True)
+
+        def unsubscribe() -> None:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    async def async_publish(
+        self, hass, topic, payload, qos=0, retain=False, encoding="utf-8"
+    ) -> None:
+        """Publish (mqtt.async_publish stand-in), then let the remote react."""
+        self.published += 1
+        raw = payload.encode() if isinstance(payload, str) else bytes(payload)
+        self.publish(topic, raw, retain)
+
+        relative = topic.removeprefix(f"{self.base}/")
+        if relative.endswith("/detail"):
+            # The remote republishes the retained commands of the device
+            commands_topic = topic.removesuffix("/detail") + "/commands"
+            if (commands := self.retained.get(commands_topic)) is not None:
+                self.publish(commands_topic, commands, True)
+        elif relative == "battery/status":
+            self.publish(f"{self.base}/battery_level", b"85", False)
+
+    def publish(self, topic: str, payload: bytes, retain: bool) -> None:
+        """Deliver a message to every matching subscription."""
+        if retain:
+            self.retained[topic] = payload
+        for subscription in list(self.subscriptions):
+            if topic_matches(subscription[0], topic):
+                self._deliver(subscription, topic, payload, retain)
+
+    def replay_retained(self) -> None:
+        """Deliver every retained message again (broker reconnect)."""
+        for topic, payload in list(self.retained.items()):
+            self.publish(topic, payload, True)
+
+    def _deliver(self, subscription, topic: str, payload: bytes, retain: bool) -> None:
+        """Schedule a delivery on the event loop (like the MQTT client does)."""
+        subscribed_topic, msg_callback, encoding = subscription
+        message = FakeMessage(
+            topic=topic,
+            payload=payload if encoding is None else payload.decode(encoding),
+            qos=0,
+            retain=retain,
+            subscribed_topic=subscribed_topic,
+        )
+        self.delivered += 1
+        self.hass.loop.call_soon(msg_callback, message)
+
+
+def build_catalog(devices: int, commands: int, macros: int) -> dict[str, Any]:
+    """Generate a synthetic RS90 catalog."""
+    names = itertools.cycle(COMMON_COMMANDS)
+    return {
+        "devices": [
+            {
+                "id": f"{device:024x}",
+                "name": f"Device {device:03d}",
+                "commands": [
+                    {
+                        "id": f"{device:012x}{command:012x}",
+                        "name": next(names) if command < len(COMMON_COMMANDS) else f"KEY_{command}",
+                    }
+                    for command in range(commands)
+                ],
+            }
+            for device in range(devices)
+        ],
+        "macros": [
+            {"id": f"{macro + 1_000_000:024x}", "name": f"Macro {macro:03d}"}
+            for macro in range(macros)
+        ],
+    }
+
+
+class Bench:
+    """One coordinator with its platforms wired to the fake broker."""
+
+    def __init__(self, hass: HomeAssistant, broker: FakeBroker, mode: str) -> None:
+        """Initialize the bench."""
+        self.hass = hass
+        self.broker = broker
+        entry_kwargs: dict[str, Any] = {
+            "version": 1,
+            "minor_version": 2,
+            "domain": DOMAIN,
+            "title": "Bench RS90",
+            "data": {CONF_REMOTE_ID: REMOTE_ID, CONF_NAME: "Bench RS90"},
+            "source": "user",
+            "options": {CONF_SUBSCRIPTION_MODE: mode},
+        }
+        # Arguments required by more recent Home Assistant versions
+        parameters = inspect.signature(ConfigEntry).parameters
+        if "discovery_keys" in parameters:
+            entry_kwargs["discovery_keys"] = {}
+        if "subentries_data" in parameters:
+            entry_kwargs["subentries_data"] = None
+        if "unique_id" in parameters:
+            entry_kwargs["unique_id"] = REMOTE_ID
+        self.entry = ConfigEntry(**entry_kwargs)
+        self.coordinator: HaptiqueRS90Coordinator | None = None
+        self.entities: list[Any] = []
+        self.writes = 0
+        self._entity_ids = itertools.count()
+
+    def _add_entities_callback(self, domain: str):
+        """Return an async_add_entities stand-in counting state writes."""
+
+        def add_entities(new_entities, update_before_add: bool = False) -> None:
+            for entity in new_entities:
+                entity.hass = self.hass
+                entity.entity_id = f"{domain}.bench_{next(self._entity_ids)}"
+                entity.async_write_ha_state = self._count_write
+                self.entities.append(entity)
+                self.hass.async_create_task(entity.async_added_to_hass())
+
+        return add_entities
+
+    def _count_write(self) -> None:
+        """Count an entity state write."""
+        self.writes += 1
+
+    async def async_setup(self) -> None:
+        """Create the coordinator and set up every platform."""
+        self.coordinator = coordinator = HaptiqueRS90Coordinator(self.hass, self.entry)
+        coordinator.device_id = "bench_device"
+        self.hass.data.setdefault(DOMAIN, {})[self.entry.entry_id] = coordinator
+        # Same steps as async_config_entry_first_refresh, without the entry state checks
+        await coordinator._async_load_snapshot()
+        await coordinator._subscribe_topics()
+        await coordinator.async_refresh()
+        for domain, module in PLATFORMS.items():
+            await module.async_setup_entry(
+                self.hass, self.entry, self._add_entities_callback(domain)
+            )
+
+    async def async_settle(self, timeout: float = 60) -> None:
+        """Wait until no message nor task is pending."""
+        deadline = time.monotonic() + timeout
+        idle_rounds = 0
+        while idle_rounds < 3 and time.monotonic() < deadline:
+            delivered = self.broker.delivered
+            await asyncio.sleep(0)
+            await self.coordinator._scheduler.async_join()
+            await asyncio.sleep(0)
+            idle_rounds = idle_rounds + 1 if delivered == self.broker.delivered else 0
+
+    def counters(self) -> dict[str, float]:
+        """Return the counters compared between scenario start and end."""
+        metrics = self.coordinator.metrics
+        return {
+            "cpu": time.process_time(),
+            "wall": time.perf_counter(),
+            "messages": metrics.messages,
+            "handler_seconds": metrics.handler_latency.total,
+            "writes": self.writes,
+            "published": self.broker.published,
+        }
+
+    def delta(self, before: dict[str, float]) -> dict[str, Any]:
+        """Return the scenario measurements since before."""
+        after = self.counters()
+        messages = after["messages"] - before["messages"]
+        writes = after["writes"] - before["writes"]
+        handler_seconds = after["handler_seconds"] - before["handler_seconds"]
+        return {
+            "wall_ms": round((after["wall"] - before["wall"]) * 1000, 2),
+            "cpu_ms": round((after["cpu"] - before["cpu"]) * 1000, 2),
+            "messages": messages,
+            "handler_cpu_ms": round(handler_seconds * 1000, 2),
+            "handler_us_per_message": (
+                round(handler_seconds / messages * 1_000_000, 2) if messages else None
+            ),
+            "entity_writes": writes,
+            "entity_writes_per_message": round(writes / messages, 3) if messages else None,
+            "published": after["published"] - before["published"],
+        }
+
+
+async def async_new_hass(config_dir: str) -> HomeAssistant:
+    """Create a bare Home Assistant instance with the registries loaded."""
+    hass = HomeAssistant(config_dir)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    return hass
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario and return the report."""
+    catalog = build_catalog(args.devices, args.commands, args.macros)
+    report: dict[str, Any] = {
+        "config": {
+            "devices": args.devices,
+            "commands_per_device": args.commands,
+            "macros": args.macros,
+            "keys": args.keys,
+            "mode": args.mode,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+    }
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_new_hass(config_dir)
+        broker = FakeBroker(hass, catalog)
+        broker.seed()
+        with patch.object(mqtt, "async_subscribe", broker.async_subscribe), patch.object(
+            mqtt, "async_publish", broker.async_publish
+        ):
+            await _async_run_scenarios(hass, broker, catalog, args, report)
+        await hass.async_stop(force=True)
+
+    return report
+
+
+async def _async_run_scenarios(
+    hass: HomeAssistant,
+    broker: FakeBroker,
+    catalog: dict[str, Any],
+    args: argparse.Namespace,
+    report: dict[str, Any],
+) -> None:
+    """Run the scenarios in order (each one starts from the state of the previous)."""
+    # Startup to full catalog (peak memory traced on this cold start)
+    bench = Bench(hass, broker, args.mode)
+
+    gc.collect()
+    tracemalloc.start()
+    before = bench.counters()
+    await bench.async_setup()
+    await bench.async_settle()
+    startup = bench.delta(before)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    startup["catalog_ready_ms"] = (
+        round(bench.coordinator.catalog_ready_time * 1000, 2)
+        if bench.coordinator.catalog_ready_time is not None
+        else None
+    )
+    startup["catalog_warm_start"] = bench.coordinator.catalog_warm_start
+    startup["entities"] = len(bench.entities)
+    report["startup"] = startup
+    report["memory"] = {"peak_traced_mb": round(peak / 1024 / 1024, 2)}
+
+    # Key press storm
+    events = 0
+
+    def count_event(_event) -> None:
+        nonlocal events
+        events += 1
+
+    remove_listener = hass.bus.async_listen(f"{DOMAIN}_key_pressed", count_event)
+    before = bench.counters()
+    for press in range(args.keys):
+        broker.publish(f"{broker.base}/keys", f"button:{press % 40}".encode(), False)
+    await bench.async_settle()
+    # Let the trailing Last Key write of the coalescing window happen
+    await asyncio.sleep(bench.coordinator._key_coalesce_window + 0.05)
+    await bench.async_settle()
+    report["key_storm"] = {**bench.delta(before), "events_fired": events}
+    remove_listener()
+
+    # Broker reconnect: retained messages replayed
+    before = bench.counters()
+    broker.replay_retained()
+    await bench.async_settle()
+    report["replay"] = {
+        **bench.delta(before),
+        "payload_cache": dict(
+            hits=bench.coordinator._fingerprint_hits,
+            misses=bench.coordinator._fingerprint_misses,
+        ),
+    }
+
+    # Macro triggers echoed by the remote
+    before = bench.counters()
+    for macro in catalog["macros"]:
+        await bench.coordinator.async_trigger_macro(macro["name"], "on")
+    await bench.async_settle()
+    report["macros"] = bench.delta(before)
+
+    # Captured production traffic (topics are relative, any remote ID works)
+    if args.replay:
+        before = bench.counters()
+        replayed = await async_replay(hass, bench.coordinator, args.replay, 0, isolated=True)
+        await bench.async_settle()
+        report["recording"] = {**bench.delta(before), "file": args.replay, "replayed": replayed}
+
+    report["coordinator_metrics"] = bench.coordinator.metrics.as_dict()
+    await bench.coordinator.async_shutdown()
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmarks and write the report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=100, help="Commands per device")
+    parser.add_argument("--macros", type=int, default=150)
+    parser.add_argument("--keys", type=int, default=2000, help="Key presses of the storm")
+    parser.add_argument("--mode", choices=("per_topic", "wildcard", "shared"), default="per_topic")
+    parser.add_argument("--replay", help="Recording made with the record_traffic service")
+    parser.add_argument(
+        "--output",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "report.json"),
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(async_run(args))
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    summary = ("startup", "key_storm", "replay", "macros", "recording", "memory")
+    print(json.dumps({key: report[key] for key in summary if key in report}, indent=2))
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,107 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    DATA_COORDINATORS_BY_DEVICE,
+    DATA_PROFILER_RUNNING,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    CONF_SUBSCRIPTION_MODE,
+    CONF_DEVICE_COMMAND_GAPS,
+    DEFAULT_SUBSCRIPTION_MODE,
+)
 from .coordinator import HaptiqueRS90Coordinator
+from .profiler import async_profile
+from .traffic import async_record, async_replay
 
 _LOGGER = logging.getLogger(__name__)
 
+SEND_SEQUENCE_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        vol.Required("steps"): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required("rs90_device_id"): cv.string,
+                        vol.Required("command_name"): cv.string,
+                        # Milliseconds to wait after this command
+                        vol.Optional("delay", default=0): vol.All(
+                            vol.Coerce(int), vol.Range(min=0, max=60000)
+                        ),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+SET_COMMAND_GAP_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        vol.Required("rs90_device_id"): cv.string,
+        # Milliseconds, omitted = use the default gap (same range as the options)
+        vol.Optional("gap"): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        # Seconds
+        vol.Optional("duration", default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+    }
+)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        # Seconds
+        vol.Optional("duration", default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+REPLAY_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        # Absolute, or relative to the configuration directory
+        vol.Required("file"): cv.string,
+        # 1 = original timing, 0 = as fast as possible
+        vol.Optional("speed", default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+    }
+)
+
+GET_DEVICE_COMMANDS_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        vol.Required("rs90_device_id"): cv.string,
+    }
+)
+
 PLATFORMS: list[Platform] = [
     Platform.BUTTON,  # RGB ring light control - First in controls section
     Platform.SENSOR,
@@ -22,6 +111,15 @@ PLATFORMS: list[Platform] = [
 ]
 
 
+@callback
+def _async_get_coordinator(hass: HomeAssistant, rs90_id: str | None) -> HaptiqueRS90Coordinator | None:
+    """Return the coordinator of an RS90 remote from its HA device ID."""
+    coordinator = hass.data.get(DATA_COORDINATORS_BY_DEVICE, {}).get(rs90_id)
+    if coordinator is None:
+        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+    return coordinator
+
+
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for Haptique RS90."""
     
@@ -35,37 +133,17 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("rs90_macro_id is required")
             return
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                
-                # Resolve rs90_macro_id to macro_name (for MQTT topic)
-                macros = coordinator.data.get("macros", [])
-                macro_name = None
-                for macro in macros:
-                    if macro.get("id") == rs90_macro_id:
-                        macro_name = macro.get("name")
-                        _LOGGER.debug("Resolved rs90_macro_id %s to macro_name: %s", 
-                                    rs90_macro_id, macro_name)
-                        break
-                
-                if not macro_name:
-                    _LOGGER.error("Could not find macro with rs90_macro_id: %s", rs90_macro_id)
-                    return
-                
-                await coordinator.async_trigger_macro(macro_name, action)
-                return
+        # Resolve rs90_macro_id to macro_name (for MQTT topic)
+        macro_name = coordinator.get_macro_name(rs90_macro_id)
+        if not macro_name:
+            _LOGGER.error("Could not find macro with rs90_macro_id: %s", rs90_macro_id)
+            return
+        _LOGGER.debug("Resolved rs90_macro_id %s to macro_name: %s", rs90_macro_id, macro_name)
         
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_trigger_macro(macro_name, action)
     
     async def handle_trigger_device_command(call):
         """Handle the trigger_device_command service call."""
@@ -77,82 +155,154 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("rs90_device_id is required")
             return
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                
-                # Resolve rs90_device_id to device_name (for MQTT topic)
-                devices = coordinator.data.get("devices", [])
-                device_name = None
-                for device in devices:
-                    if device.get("id") == rs90_device_id:
-                        device_name = device.get("name")
-                        _LOGGER.debug("Resolved rs90_device_id %s to device_name: %s", 
-                                    rs90_device_id, device_name)
-                        break
-                
-                if not device_name:
-                    _LOGGER.error("Could not find device with rs90_device_id: %s", rs90_device_id)
-                    return
-                
-                await coordinator.async_trigger_device_command(device_name, command_name)
-                return
+        # Resolve rs90_device_id to device_name (for MQTT topic)
+        device_name = coordinator.get_device_name(rs90_device_id)
+        if not device_name:
+            _LOGGER.error("Could not find device with rs90_device_id: %s", rs90_device_id)
+            return
+        _LOGGER.debug("Resolved rs90_device_id %s to device_name: %s", rs90_device_id, device_name)
         
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_trigger_device_command(device_name, command_name)
     
     async def handle_refresh_lists(call):
         """Handle the refresh_lists service call."""
         rs90_id = call.data.get("rs90_id")
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                await coordinator.async_force_refresh_lists()
-                _LOGGER.info("Force refresh lists requested for device: %s", rs90_id)
-                return
-        
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_force_refresh_lists()
+        _LOGGER.info("Force refresh lists requested for device: %s", rs90_id)
     
     async def handle_trigger_rgb_light(call):
         """Handle the trigger_rgb_light service call."""
         rs90_id = call.data.get("rs90_id")
         duration = call.data.get("duration", 5)  # Default 5 seconds
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            return
+        
+        await coordinator.async_control_led_light("on", duration=duration)
+        _LOGGER.info("RGB light triggered for device: %s with duration: %d", rs90_id, duration)
+    
+    async def handle_send_sequence(call):
+        """Handle the send_sequence service call."""
+        rs90_id = call.data.get("rs90_id")
         
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                await coordinator.async_control_led_light("on", duration=duration)
-                _LOGGER.info("RGB light triggered for device: %s with duration: %d", rs90_id, duration)
+        # Resolve every device once, before anything is sent
+        steps = []
+        for step in call.data["steps"]:
+            device_name = coordinator.get_device_name(step["rs90_device_id"])
+            if not device_name:
+                _LOGGER.error("Could not find device with rs90_device_id: %s", step["rs90_device_id"])
                 return
+            steps.append((device_name, step["command_name"], step["delay"] / 1000))
         
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        coordinator.async_send_sequence(steps)
+        _LOGGER.debug("Command sequence started: %d steps", len(steps))
+    
+    async def handle_set_command_gap(call):
+        """Handle the set_command_gap service call."""
+        rs90_id = call.data["rs90_id"]
+        rs90_device_id = call.data["rs90_device_id"]
+        gap = call.data.get("gap")  # Milliseconds, omitted = use the default gap
+        
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            return
+        
+        entry = coordinator.entry
+        gaps = dict(entry.options.get(CONF_DEVICE_COMMAND_GAPS, {}))
+        if gap is None:
+            gaps.pop(rs90_device_id, None)
+        else:
+            gaps[rs90_device_id] = gap
+        
+        # Stored in the options - applied by the update listener
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_DEVICE_COMMAND_GAPS: gaps}
+        )
+        _LOGGER.info("Command gap for device %s set to: %s ms", rs90_device_id, gap)
+    
+    async def handle_profile(call):
+        """Handle the profile service call."""
+        rs90_id = call.data.get("rs90_id")
+        duration = call.data["duration"]
+        
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            return
+        
+        if hass.data.get(DATA_PROFILER_RUNNING):
+            _LOGGER.error("A profile is already running")
+            return
+        
+        hass.data[DATA_PROFILER_RUNNING] = True
+        _LOGGER.warning("Profiling the integration for %g seconds", duration)
+        try:
+            path = await async_profile(hass, coordinator.remote_id, duration)
+        except ValueError as err:  # Another profiler is active on the event loop
+            _LOGGER.error("Could not start profiling: %s", err)
+            return
+        finally:
+            hass.data.pop(DATA_PROFILER_RUNNING, None)
+        _LOGGER.warning("Profile report written to %s", path)
+    
+    async def handle_record_traffic(call):
+        """Handle the record_traffic service call."""
+        rs90_id = call.data.get("rs90_id")
+        duration = call.data["duration"]
+        
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            return
+        
+        _LOGGER.warning("Recording MQTT traffic of remote %s for %g seconds", coordinator.remote_id, duration)
+        path = await async_record(hass, coordinator, duration)
+        _LOGGER.warning("MQTT traffic recorded to %s", path)
+    
+    async def handle_replay_traffic(call):
+        """Handle the replay_traffic service call."""
+        rs90_id = call.data.get("rs90_id")
+        path = call.data["file"]
+        speed = call.data["speed"]
+        
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            return
+        
+        if not os.path.isabs(path):
+            path = hass.config.path(path)
+        if not hass.config.is_allowed_path(path):
+            _LOGGER.error("Recording path is not allowed: %s", path)
+            return
+        
+        try:
+            count = await async_replay(hass, coordinator, path, speed)
+        except (OSError, ValueError, KeyError) as err:
+            _LOGGER.error("Could not replay %s: %s", path, err)
+            return
+        _LOGGER.info("Replayed %d messages from %s", count, path)
+    
+    async def handle_get_device_commands(call: ServiceCall) -> ServiceResponse:
+        """Handle the get_device_commands service call (full catalog on demand)."""
+        rs90_id = call.data["rs90_id"]
+        rs90_device_id = call.data["rs90_device_id"]
+        
+        if (coordinator := _async_get_coordinator(hass, rs90_id)) is None:
+            raise ServiceValidationError(f"Haptique RS90 remote not found: {rs90_id}")
+        
+        device_name = coordinator.get_device_name(rs90_device_id)
+        if not device_name:
+            raise ServiceValidationError(f"Could not find device with rs90_device_id: {rs90_device_id}")
+        
+        return {
+            "rs90_device_id": rs90_device_id,
+            "device_name": device_name,
+            "commands": coordinator.get_device_commands(device_name),
+        }
     
     # Register services only once
     if not hass.services.has_service(DOMAIN, "trigger_macro"):
@@ -182,47 +332,89 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             "trigger_rgb_light",
             handle_trigger_rgb_light,
         )
+    
+    if not hass.services.has_service(DOMAIN, "send_sequence"):
+        hass.services.async_register(
+            DOMAIN,
+            "send_sequence",
+            handle_send_sequence,
+            schema=SEND_SEQUENCE_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, "set_command_gap"):
+        hass.services.async_register(
+            DOMAIN,
+            "set_command_gap",
+            handle_set_command_gap,
+            schema=SET_COMMAND_GAP_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, "profile"):
+        hass.services.async_register(
+            DOMAIN,
+            "profile",
+            handle_profile,
+            schema=PROFILE_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, "get_device_commands"):
+        hass.services.async_register(
+            DOMAIN,
+            "get_device_commands",
+            handle_get_device_commands,
+            schema=GET_DEVICE_COMMANDS_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    if not hass.services.has_service(DOMAIN, "record_traffic"):
+        hass.services.async_register(
+            DOMAIN,
+            "record_traffic",
+            handle_record_traffic,
+            schema=RECORD_TRAFFIC_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, "replay_traffic"):
+        hass.services.async_register(
+            DOMAIN,
+            "replay_traffic",
+            handle_replay_traffic,
+            schema=REPLAY_TRAFFIC_SCHEMA,
+        )
 
 
-async def _async_cleanup_old_macro_info_sensors(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Remove old macro info sensors and device list sensor (migration v1.5.0 -> v1.6.0)."""
-    from homeassistant.helpers import entity_registry as er
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry (runs once per version change, before setup)."""
+    if entry.version > 1:
+        # Downgraded from a future major version
+        return False
+    
+    if entry.minor_version < 2:
+        # 1.1 -> 1.2: remove the macro info and device list sensors (v1.5.0 -> v1.6.0)
+        _async_remove_obsolete_sensors(hass, entry)
+        hass.config_entries.async_update_entry(entry, minor_version=2)
+        _LOGGER.debug("Migrated entry %s to version 1.2", entry.entry_id)
     
+    return True
+
+
+@callback
+def _async_remove_obsolete_sensors(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the old macro info sensors and device list sensor of an entry."""
     entity_registry = er.async_get(hass)
-    remote_id = entry.data["remote_id"]
-    
-    _LOGGER.info("=== Starting cleanup of old sensors for entry: %s ===", entry.entry_id)
-    
-    # Find all macro info sensors and device list sensor for this remote
-    entities_to_remove = []
-    all_entities = []
-    
-    for entity in entity_registry.entities.values():
-        if entity.platform == DOMAIN and entity.config_entry_id == entry.entry_id:
-            all_entities.append(f"{entity.entity_id} (unique_id: {entity.unique_id})")
-            
-            # Check if it's a macro info sensor (unique_id contains "macro_info_")
-            # or device list sensor (unique_id ends with "_device_list")
-            if entity.unique_id:
-                if "macro_info_" in entity.unique_id or entity.unique_id.endswith("_device_list"):
-                    entities_to_remove.append(entity.entity_id)
-                    _LOGGER.info("Found old sensor to remove: %s (unique_id: %s)", entity.entity_id, entity.unique_id)
-    
-    _LOGGER.info("All entities for this integration: %s", all_entities)
-    _LOGGER.info("Entities marked for removal: %s", entities_to_remove)
-    
-    # Remove all found entities
-    for entity_id in entities_to_remove:
-        try:
-            entity_registry.async_remove(entity_id)
-            _LOGGER.info("✓ Successfully removed old sensor: %s", entity_id)
-        except Exception as err:
-            _LOGGER.error("✗ Failed to remove sensor %s: %s", entity_id, err)
-    
-    if entities_to_remove:
-        _LOGGER.info("=== Migration complete: Removed %d old sensors ===", len(entities_to_remove))
-    else:
-        _LOGGER.info("=== No old sensors found to remove ===")
+    removed = 0
+    for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        # Macro info sensors (unique_id contains "macro_info_")
+        # or device list sensor (unique_id ends with "_device_list")
+        if entity.unique_id and (
+            "macro_info_" in entity.unique_id or entity.unique_id.endswith("_device_list")
+        ):
+            entity_registry.async_remove(entity.entity_id)
+            removed += 1
+            _LOGGER.debug("Removed old sensor: %s (unique_id: %s)", entity.entity_id, entity.unique_id)
+    
+    if removed:
+        _LOGGER.info("Removed %d obsolete sensors", removed)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -239,13 +431,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Subscribe to MQTT topics and start coordinator
     await coordinator.async_config_entry_first_refresh()
     
-    # Setup platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
-    # Cleanup old sensors AFTER platforms are loaded
-    await _async_cleanup_old_macro_info_sensors(hass, entry)
-    
-    # Register device
+    # Register device before the platforms (the summary sensor exposes its ID)
     device_registry = dr.async_get(hass)
     device_entry = device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
@@ -259,12 +445,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Store HA device ID in coordinator for event firing
     coordinator.device_id = device_entry.id
     
+    # Index the coordinator by HA device ID for service calls
+    hass.data.setdefault(DATA_COORDINATORS_BY_DEVICE, {})[device_entry.id] = coordinator
+    
+    # Setup platforms
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    
     # Register services
     await async_setup_services(hass)
     
+    # Apply option changes without reloading the entry
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Handle options update."""
+    coordinator: HaptiqueRS90Coordinator = hass.data[DOMAIN][entry.entry_id]
+    
+    # MQTT subscriptions are set up once: a mode change needs a reload
+    subscription_mode = entry.options.get(CONF_SUBSCRIPTION_MODE, DEFAULT_SUBSCRIPTION_MODE)
+    if subscription_mode != coordinator.subscription_mode:
+        _LOGGER.info("Subscription mode changed to %s - reloading", subscription_mode)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    
+    coordinator.async_apply_options()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Haptique RS90 Remote integration")
@@ -279,6 +488,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         # Remove coordinator
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data.get(DATA_COORDINATORS_BY_DEVICE, {}).pop(coordinator.device_id, None)
     
     return unload_ok
 
@@ -286,3 +496,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     _LOGGER.debug("Removing Haptique RS90 Remote integration")
+    
+    # Remove the persisted catalog snapshot (the entry was unloaded first: the
+    # coordinator wrote its pending save, no write can follow the removal)
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
@@ -0,0 +1,264 @@
+"""Outbound command queue for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lower value = sent first
+PRIORITY_MACRO = 0
+PRIORITY_DEVICE_COMMAND = 1
+
+
+@dataclass(slots=True)
+class QueuedCommand:
+    """A message waiting to be published."""
+
+    topic: str
+    payload: str
+    qos: int
+    retain: bool
+    gap_key: str | None  # Pacing key (RS90 device ID), None = not paced
+    enqueued_at: float
+    future: asyncio.Future
+    repeat: int = 1  # Identical commands coalesced into this entry
+    published: int = 0  # Repeats already published
+
+
+class CommandQueue:
+    """Per-remote outbound queue with IR pacing and repeat coalescing.
+
+    A single worker publishes the queued messages in priority order (macro
+    triggers before device commands, FIFO within a priority) and keeps a
+    minimum gap between two commands sent to the same device, so IR devices
+    do not miss commands sent in bursts.
+
+    Messages of one topic are published in the order they were submitted:
+    a command is only coalesced into the last queued entry of its topic,
+    and the later entries of a topic wait for the repeats of an earlier one.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        publish: Callable[[str, str, int, bool], Awaitable[None]],
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._name = name
+        self._publish = publish
+        self._heap: list[tuple[int, int, QueuedCommand]] = []
+        self._sequence = itertools.count()
+        self._tails: dict[str, QueuedCommand] = {}  # Last unstarted entry per topic
+        self._repeating: dict[str, QueuedCommand] = {}  # Entry with repeats left per topic
+        self._last_sent: dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+        # Settings (see async_apply_options of the coordinator)
+        self.default_gap = 0.0
+        self.device_gaps: dict[str, float] = {}
+        self.coalesce = False
+
+        # Metrics
+        self.max_depth = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued entries."""
+        return len(self._heap)
+
+    @callback
+    def async_submit(
+        self,
+        topic: str,
+        payload: str,
+        *,
+        qos: int,
+        retain: bool = False,
+        priority: int = PRIORITY_DEVICE_COMMAND,
+        gap_key: str | None = None,
+    ) -> asyncio.Future:
+        """Queue a message.
+
+        Returns:
+            Future resolved once the message (and its repeats) is published
+        """
+        if (
+            self.coalesce
+            and (queued := self._tails.get(topic)) is not None
+            and queued.payload == payload
+        ):
+            queued.repeat += 1
+            self.coalesced += 1
+            return queued.future
+
+        item = QueuedCommand(
+            topic=topic,
+            payload=payload,
+            qos=qos,
+            retain=retain,
+            gap_key=gap_key,
+            enqueued_at=time.monotonic(),
+            future=self._hass.loop.create_future(),
+        )
+        self._tails[topic] = item
+        heapq.heappush(self._heap, (priority, next(self._sequence), item))
+        self.max_depth = max(self.max_depth, len(self._heap))
+
+        if self._worker is None:
+            self._worker = self._hass.async_create_background_task(
+                self._async_run(), f"{self._name} command queue"
+            )
+        self._wakeup.set()
+        return item.future
+
+    async def _async_run(self) -> None:
+        """Publish queued messages forever.
+
+        The highest-priority entry whose device gap has elapsed is published
+        first: a device waiting out its gap never delays macros or the
+        commands of other devices. Repeats of a coalesced entry go back to
+        the queue as new entries, one publish at a time, and hold back the
+        later entries of their topic until the last one is published.
+        """
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            entry, next_ready = self._async_pop_ready()
+            if entry is None:
+                # Every queued device is in its gap: sleep until the first one
+                # is ready, or until a new message is queued
+                self._wakeup.clear()
+                try:
+                    async with asyncio.timeout(next_ready - time.monotonic()):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                continue
+
+            item = entry[2]
+            if item.published == 0:
+                if self._tails.get(item.topic) is item:
+                    del self._tails[item.topic]
+                wait = time.monotonic() - item.enqueued_at
+                self._wait_count += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+            try:
+                await self._publish(item.topic, item.payload, item.qos, item.retain)
+            except asyncio.CancelledError:
+                if not item.future.done():
+                    item.future.cancel()
+                raise
+            except Exception as err:  # noqa: BLE001 - report to the caller, keep the worker alive
+                self.failed += 1
+                if self._repeating.get(item.topic) is item:
+                    del self._repeating[item.topic]
+                if not item.future.done():
+                    item.future.set_exception(err)
+                continue
+
+            self.sent += 1
+            item.published += 1
+            if item.gap_key is not None:
+                self._last_sent[item.gap_key] = time.monotonic()
+            if item.published < item.repeat:
+                self._repeating[item.topic] = item
+                heapq.heappush(self._heap, (entry[0], next(self._sequence), item))
+                continue
+            if self._repeating.get(item.topic) is item:
+                del self._repeating[item.topic]
+            if not item.future.done():
+                item.future.set_result(None)
+
+    def _ready_at(self, gap_key: str | None) -> float:
+        """Return the monotonic time the next command of a device may be sent."""
+        if gap_key is None or (last_sent := self._last_sent.get(gap_key)) is None:
+            return 0.0
+        return last_sent + self.device_gaps.get(gap_key, self.default_gap)
+
+    def _async_pop_ready(
+        self,
+    ) -> tuple[tuple[int, int, QueuedCommand] | None, float | None]:
+        """Pop the highest-priority entry that may be sent now.
+
+        Entries of a topic whose earlier entry still has repeats left are
+        skipped (that entry is in the heap and sets the wake-up time).
+
+        Returns:
+            The entry (None if every queued device is in its gap) and, when
+            none is ready, the earliest time one becomes ready
+        """
+        now = time.monotonic()
+        skipped = []
+        entry = None
+        next_ready = None
+        while self._heap:
+            candidate = heapq.heappop(self._heap)
+            repeating = self._repeating.get(candidate[2].topic)
+            if repeating is not None and repeating is not candidate[2]:
+                skipped.append(candidate)
+                continue
+            ready_at = self._ready_at(candidate[2].gap_key)
+            if ready_at <= now:
+                entry = candidate
+                break
+            skipped.append(candidate)
+            if next_ready is None or ready_at < next_ready:
+                next_ready = ready_at
+        for candidate in skipped:
+            heapq.heappush(self._heap, candidate)
+        return entry, next_ready
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop the worker and cancel the queued messages."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for _, _, item in self._heap:
+            if not item.future.done():
+                item.future.cancel()
+        self._heap.clear()
+        self._tails.clear()
+        self._repeating.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return queue metrics for diagnostics."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "wait_avg_ms": (
+                round(self._wait_total / self._wait_count * 1000, 1)
+                if self._wait_count
+                else None
+            ),
+            "wait_max_ms": round(self._wait_max * 1000, 1),
+            "default_gap_ms": round(self.default_gap * 1000),
+            "device_gaps_ms": {key: round(gap * 1000) for key, gap in self.device_gaps.items()},
+            "coalesce": self.coalesce,
+        }
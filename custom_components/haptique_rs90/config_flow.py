@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 
@@ -13,15 +13,82 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
 
-from .const import DOMAIN, CONF_REMOTE_ID, CONF_NAME
+from .const import (
+    DOMAIN,
+    TOPIC_BASE,
+    TOPIC_STATUS,
+    CONF_REMOTE_ID,
+    CONF_NAME,
+    CONF_KEY_COALESCE_WINDOW,
+    CONF_SUBSCRIPTION_MODE,
+    CONF_SUBSCRIBE_CONCURRENCY,
+    CONF_COMMAND_GAP,
+    CONF_COALESCE_COMMANDS,
+    CONF_COMPACT_COMMAND_ATTRIBUTES,
+    DEFAULT_KEY_COALESCE_WINDOW,
+    DEFAULT_SUBSCRIPTION_MODE,
+    DEFAULT_SUBSCRIBE_CONCURRENCY,
+    DEFAULT_COMMAND_GAP,
+    DEFAULT_COALESCE_COMMANDS,
+    DEFAULT_COMPACT_COMMAND_ATTRIBUTES,
+    SUBSCRIPTION_MODE_PER_TOPIC,
+    SUBSCRIPTION_MODE_WILDCARD,
+    SUBSCRIPTION_MODE_SHARED,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.helpers.service_info.mqtt import MqttServiceInfo
 
 _LOGGER = logging.getLogger(__name__)
 
+# Manual discovery: maximum wait for a first unconfigured remote, then a short
+# window collecting the rest of the retained status burst
+DISCOVERY_TIMEOUT = 5
+DISCOVERY_SETTLE = 0.2
+
 
 class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Haptique RS90 Remote."""
 
     VERSION = 1
+    # 1.2: obsolete macro info and device list sensors removed (see async_migrate_entry)
+    MINOR_VERSION = 2
+
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._remote_id: str | None = None
+
+    async def async_step_mqtt(self, discovery_info: MqttServiceInfo) -> FlowResult:
+        """Handle a remote discovered by its Haptique/{remote_id}/status message."""
+        topic_parts = discovery_info.topic.split("/")
+        if len(topic_parts) != 3 or topic_parts[0] != TOPIC_BASE or not topic_parts[1]:
+            return self.async_abort(reason="invalid_discovery_info")
+        
+        remote_id = topic_parts[1]
+        await self.async_set_unique_id(remote_id)
+        self._abort_if_unique_id_configured()
+        
+        _LOGGER.debug("Discovered Haptique RS90 with ID: %s", remote_id)
+        self._remote_id = remote_id
+        self.context["title_placeholders"] = {"name": f"RS90 {remote_id[:8]}"}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm a discovered remote and name it."""
+        if user_input is not None:
+            return self._async_create_remote_entry(self._remote_id, user_input.get(CONF_NAME))
+        
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_NAME, default=f"RS90 {self._remote_id[:8]}"): str,
+                }
+            ),
+            description_placeholders={"remote_id": self._remote_id},
+        )
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -33,44 +100,34 @@ class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if not await mqtt.async_wait_for_mqtt_client(self.hass):
             return self.async_abort(reason="mqtt_not_configured")
 
-        if user_input is not None:
-            # Use the discovered remote_id or default
-            remote_id = self.context.get("remote_id", "")
-            
-            if not remote_id:
-                errors["base"] = "no_remote_found"
-            else:
-                # Check if already configured
-                await self.async_set_unique_id(remote_id)
-                self._abort_if_unique_id_configured()
-                
-                # Create entry
-                device_name = user_input.get(CONF_NAME, f"RS90 {remote_id[:8]}")
-                return self.async_create_entry(
-                    title=device_name,
-                    data={
-                        CONF_REMOTE_ID: remote_id,
-                        CONF_NAME: device_name,
-                    },
-                )
-
-        # Try to discover remote automatically
-        discovered_remote = await self._discover_remote()
+        if user_input is not None and (remote_id := user_input.get(CONF_REMOTE_ID)):
+            # Check if already configured
+            await self.async_set_unique_id(remote_id)
+            self._abort_if_unique_id_configured()
+            return self._async_create_remote_entry(remote_id, user_input.get(CONF_NAME))
+
+        # Discover the unconfigured remotes (submitting without a remote retries)
+        discovered_remotes = await self._discover_remotes()
         
-        if discovered_remote:
-            self.context["remote_id"] = discovered_remote
-            remote_display = f"{discovered_remote[:8]}..."
+        if discovered_remotes:
+            data_schema = vol.Schema(
+                {
+                    vol.Required(CONF_REMOTE_ID, default=discovered_remotes[0]): vol.In(
+                        {remote_id: f"RS90 {remote_id[:8]}..." for remote_id in discovered_remotes}
+                    ),
+                    vol.Optional(CONF_NAME, default="RS90 Salon"): str,
+                }
+            )
+            remote_display = ", ".join(f"{remote_id[:8]}..." for remote_id in discovered_remotes)
         else:
+            data_schema = vol.Schema(
+                {
+                    vol.Optional(CONF_NAME, default="RS90 Salon"): str,
+                }
+            )
             remote_display = "Non trouvé"
             errors["base"] = "no_remote_found"
 
-        # Show configuration form
-        data_schema = vol.Schema(
-            {
-                vol.Optional(CONF_NAME, default=f"RS90 Salon"): str,
-            }
-        )
-
         return self.async_show_form(
             step_id="user",
             data_schema=data_schema,
@@ -80,34 +137,57 @@ class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
-    async def _discover_remote(self) -> str | None:
-        """Try to discover a Haptique RS90 remote on MQTT."""
-        _LOGGER.info("Attempting to discover Haptique RS90 remote...")
+    @callback
+    def _async_create_remote_entry(self, remote_id: str, name: str | None) -> FlowResult:
+        """Create the config entry of a remote."""
+        device_name = name or f"RS90 {remote_id[:8]}"
+        return self.async_create_entry(
+            title=device_name,
+            data={
+                CONF_REMOTE_ID: remote_id,
+                CONF_NAME: device_name,
+            },
+        )
+
+    async def _discover_remotes(self) -> list[str]:
+        """Discover the unconfigured Haptique RS90 remotes on MQTT.
         
-        discovered_id = None
+        Returns as soon as a first unconfigured remote is seen (plus a short
+        window for the other retained statuses), or after DISCOVERY_TIMEOUT.
+        """
+        _LOGGER.debug("Attempting to discover Haptique RS90 remotes...")
+        
+        configured = self._async_current_ids()
+        discovered: list[str] = []
+        found = asyncio.Event()
         
         @callback
         def remote_discovered(msg):
             """Handle discovered remote."""
-            nonlocal discovered_id
             # Extract remote ID from topic: Haptique/{RemoteID}/status
             topic_parts = msg.topic.split("/")
-            if len(topic_parts) >= 2 and topic_parts[0] == "Haptique":
-                discovered_id = topic_parts[1]
-                _LOGGER.info("Discovered Haptique RS90 with ID: %s", discovered_id)
+            if len(topic_parts) != 3 or topic_parts[0] != TOPIC_BASE:
+                return
+            remote_id = topic_parts[1]
+            if remote_id and remote_id not in configured and remote_id not in discovered:
+                _LOGGER.debug("Discovered Haptique RS90 with ID: %s", remote_id)
+                discovered.append(remote_id)
+                found.set()
         
         # Subscribe to discovery topic
         unsubscribe = await mqtt.async_subscribe(
-            self.hass, "Haptique/+/status", remote_discovered, qos=1
+            self.hass, f"{TOPIC_BASE}/+/{TOPIC_STATUS}", remote_discovered, qos=1
         )
+        try:
+            async with asyncio.timeout(DISCOVERY_TIMEOUT):
+                await found.wait()
+            await asyncio.sleep(DISCOVERY_SETTLE)
+        except TimeoutError:
+            _LOGGER.debug("No unconfigured Haptique RS90 remote found")
+        finally:
+            unsubscribe()
         
-        # Wait a bit for discovery
-        await asyncio.sleep(2)
-        
-        # Unsubscribe
-        unsubscribe()
-        
-        return discovered_id
+        return discovered
 
     @staticmethod
     @callback
@@ -138,7 +218,18 @@ class HaptiqueRS90OptionsFlow(config_entries.OptionsFlow):
                     CONF_NAME: user_input[CONF_NAME],
                 },
             )
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(
+                title="",
+                data={
+                    **self._config_entry.options,
+                    CONF_KEY_COALESCE_WINDOW: user_input[CONF_KEY_COALESCE_WINDOW],
+                    CONF_SUBSCRIPTION_MODE: user_input[CONF_SUBSCRIPTION_MODE],
+                    CONF_SUBSCRIBE_CONCURRENCY: user_input[CONF_SUBSCRIBE_CONCURRENCY],
+                    CONF_COMMAND_GAP: user_input[CONF_COMMAND_GAP],
+                    CONF_COALESCE_COMMANDS: user_input[CONF_COALESCE_COMMANDS],
+                    CONF_COMPACT_COMMAND_ATTRIBUTES: user_input[CONF_COMPACT_COMMAND_ATTRIBUTES],
+                },
+            )
 
         return self.async_show_form(
             step_id="init",
@@ -151,6 +242,51 @@ class HaptiqueRS90OptionsFlow(config_entries.OptionsFlow):
                             f"RS90 {self._config_entry.data[CONF_REMOTE_ID][:8]}"
                         ),
                     ): str,
+                    vol.Required(
+                        CONF_KEY_COALESCE_WINDOW,
+                        default=self._config_entry.options.get(
+                            CONF_KEY_COALESCE_WINDOW, DEFAULT_KEY_COALESCE_WINDOW
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                    vol.Required(
+                        CONF_SUBSCRIPTION_MODE,
+                        default=self._config_entry.options.get(
+                            CONF_SUBSCRIPTION_MODE, DEFAULT_SUBSCRIPTION_MODE
+                        ),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                SUBSCRIPTION_MODE_PER_TOPIC,
+                                SUBSCRIPTION_MODE_WILDCARD,
+                                SUBSCRIPTION_MODE_SHARED,
+                            ],
+                            translation_key=CONF_SUBSCRIPTION_MODE,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_SUBSCRIBE_CONCURRENCY,
+                        default=self._config_entry.options.get(
+                            CONF_SUBSCRIBE_CONCURRENCY, DEFAULT_SUBSCRIBE_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Required(
+                        CONF_COMMAND_GAP,
+                        default=self._config_entry.options.get(
+                            CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+                    vol.Required(
+                        CONF_COALESCE_COMMANDS,
+                        default=self._config_entry.options.get(
+                            CONF_COALESCE_COMMANDS, DEFAULT_COALESCE_COMMANDS
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_COMPACT_COMMAND_ATTRIBUTES,
+                        default=self._config_entry.options.get(
+                            CONF_COMPACT_COMMAND_ATTRIBUTES, DEFAULT_COMPACT_COMMAND_ATTRIBUTES
+                        ),
+                    ): bool,
                 }
             ),
         )
@@ -2,6 +2,34 @@
 
 DOMAIN = "haptique_rs90"
 
+# hass.data key: HA device ID -> coordinator (O(1) service call resolution)
+DATA_COORDINATORS_BY_DEVICE = f"{DOMAIN}_coordinators_by_device"
+
+# hass.data key: MQTT hub shared by the remotes in shared subscription mode
+DATA_HUB = f"{DOMAIN}_hub"
+HUB_RESYNC_TIME = 10  # Seconds a remote-specific subscription is kept to get its retained messages back
+
+# hass.data key: set while a profile service call is running (one at a time)
+DATA_PROFILER_RUNNING = f"{DOMAIN}_profiler_running"
+
+# Catalog snapshot storage (devices, macros, device commands) - one file per entry
+STORAGE_KEY = f"{DOMAIN}.catalog"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # Seconds, coalesces bursts of list/commands updates
+
+# Troubleshooting without debug logs
+RECENT_MESSAGES_SIZE = 50  # MQTT messages kept per remote for diagnostics
+LOG_SAMPLE_INTERVAL = 60  # Seconds between two occurrences of a repeated hot-path warning
+
+# Performance metrics
+HANDLER_LATENCY_BUDGET = 0.005  # Seconds, slower message handlers are flagged
+METRICS_UPDATE_INTERVAL = 60  # Seconds between two updates of the metrics sensors
+
+# Macro trigger confirmation (echo of the state by the remote on the trigger topic,
+# after the echo of our own publish by the broker)
+MACRO_CONFIRMATION_TIMEOUT = 5  # Seconds before an unconfirmed optimistic state is rolled back
+MACRO_LATENCY_SAMPLES = 100  # Last echo latencies kept for the percentiles
+
 # MQTT Topics
 TOPIC_BASE = "Haptique"
 TOPIC_STATUS = "status"
@@ -26,8 +54,44 @@ ATTR_BUTTON_NUMBER = "button_number"
 # Config
 CONF_REMOTE_ID = "remote_id"
 CONF_NAME = "name"
+CONF_KEY_COALESCE_WINDOW = "key_coalesce_window"  # Seconds between Last Key sensor writes
+CONF_SUBSCRIPTION_MODE = "subscription_mode"
+CONF_SUBSCRIBE_CONCURRENCY = "subscribe_concurrency"  # Parallel device/macro subscription jobs
+CONF_COMMAND_GAP = "command_gap"  # Default minimum gap (ms) between two commands to one device
+CONF_DEVICE_COMMAND_GAPS = "device_command_gaps"  # Per-device overrides: RS90 device ID -> gap (ms)
+CONF_COALESCE_COMMANDS = "coalesce_commands"  # Merge identical queued commands (sent with a repeat count)
+CONF_COMPACT_COMMAND_ATTRIBUTES = "compact_command_attributes"  # Drop the command_N attributes
+
+# Subscription modes
+SUBSCRIPTION_MODE_PER_TOPIC = "per_topic"  # One broker subscription per topic
+SUBSCRIPTION_MODE_WILDCARD = "wildcard"  # Single Haptique/{remote_id}/# subscription, routed in-process
+SUBSCRIPTION_MODE_SHARED = "shared"  # One Haptique/+/# subscription for all remotes (domain hub)
+
+# Defaults
+DEFAULT_KEY_COALESCE_WINDOW = 0.25
+DEFAULT_SUBSCRIPTION_MODE = SUBSCRIPTION_MODE_PER_TOPIC
+DEFAULT_SUBSCRIBE_CONCURRENCY = 4
+DEFAULT_COMMAND_GAP = 0
+DEFAULT_COALESCE_COMMANDS = False
+DEFAULT_COMPACT_COMMAND_ATTRIBUTES = False
+
+# Battery level requests (the RS90 does not push its battery level)
+BATTERY_REFRESH_INTERVAL = 3600  # Seconds
 
 # States
 STATE_ONLINE = "online"
 STATE_OFFLINE = "offline"
 
+# Coordinator data channels (entities listen only to the slices they render)
+CHANNEL_STATUS = "status"
+CHANNEL_BATTERY = "battery"
+CHANNEL_KEYS = "keys"
+CHANNEL_TEST_STATUS = "test_status"
+CHANNEL_LED_LIGHT = "led_light"
+CHANNEL_CATALOG = "catalog"  # Keyed by CATALOG_DEVICES / CATALOG_MACROS
+CHANNEL_MACRO_STATE = "macro_state"  # Keyed by RS90 macro ID
+CHANNEL_COMMANDS = "commands"  # Keyed by RS90 device ID
+CHANNEL_METRICS = "metrics"  # Notified every METRICS_UPDATE_INTERVAL
+
+CATALOG_DEVICES = "devices"
+CATALOG_MACROS = "macros"
@@ -2,19 +2,54 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
 import logging
+import re
 import time
 from typing import Any
 
 from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
 from .const import (
     DOMAIN,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    STORAGE_SAVE_DELAY,
+    RECENT_MESSAGES_SIZE,
+    LOG_SAMPLE_INTERVAL,
+    HANDLER_LATENCY_BUDGET,
+    METRICS_UPDATE_INTERVAL,
+    MACRO_CONFIRMATION_TIMEOUT,
+    MACRO_LATENCY_SAMPLES,
     CONF_REMOTE_ID,
+    CONF_KEY_COALESCE_WINDOW,
+    CONF_SUBSCRIPTION_MODE,
+    CONF_SUBSCRIBE_CONCURRENCY,
+    CONF_COMMAND_GAP,
+    CONF_DEVICE_COMMAND_GAPS,
+    CONF_COALESCE_COMMANDS,
+    CONF_COMPACT_COMMAND_ATTRIBUTES,
+    DEFAULT_KEY_COALESCE_WINDOW,
+    DEFAULT_SUBSCRIPTION_MODE,
+    DEFAULT_SUBSCRIBE_CONCURRENCY,
+    DEFAULT_COMMAND_GAP,
+    DEFAULT_COALESCE_COMMANDS,
+    DEFAULT_COMPACT_COMMAND_ATTRIBUTES,
+    SUBSCRIPTION_MODE_PER_TOPIC,
+    SUBSCRIPTION_MODE_WILDCARD,
+    SUBSCRIPTION_MODE_SHARED,
+    BATTERY_REFRESH_INTERVAL,
     TOPIC_BASE,
     TOPIC_STATUS,
     TOPIC_DEVICE_LIST,
@@ -25,11 +60,37 @@ from .const import (
     TOPIC_TEST_STATUS,
     TOPIC_LED_LIGHT,
     STATE_ONLINE,
-    STATE_OFFLINE,
+    CHANNEL_STATUS,
+    CHANNEL_BATTERY,
+    CHANNEL_KEYS,
+    CHANNEL_TEST_STATUS,
+    CHANNEL_LED_LIGHT,
+    CHANNEL_CATALOG,
+    CHANNEL_MACRO_STATE,
+    CHANNEL_COMMANDS,
+    CHANNEL_METRICS,
+    CATALOG_DEVICES,
+    CATALOG_MACROS,
 )
+from .command_queue import CommandQueue, PRIORITY_DEVICE_COMMAND, PRIORITY_MACRO
+from .hub import async_get_hub
+from .metrics import MetricsRegistry
+from .models import (
+    CatalogDelta,
+    CatalogList,
+    MQTTMessage,
+    PendingMacroCommand,
+    RemoteState,
+    RS90Command,
+    commands_from_payload,
+)
+from .scheduler import SubscriptionScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Key payload format: "button:#"
+_KEY_PAYLOAD_RE = re.compile(r"button:\s*(\d+)")
+
 
 class HaptiqueRS90Coordinator(DataUpdateCoordinator):
     """Class to manage fetching Haptique RS90 data from MQTT."""
@@ -46,50 +107,350 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         
         self.entry = entry
         self.remote_id = entry.data[CONF_REMOTE_ID]
-        self.device_id = None  # Will be set after device registration
+        self._key_event_type = f"{DOMAIN}_key_pressed"
+        self.device_id = None  # Will be set after device registration (builds key event template)
         self._subscriptions: list[callable] = []  # Global subscriptions (status, battery, etc.)
         self._macro_subscriptions: dict[str, callable] = {}  # Macro-specific subscriptions
+        self._device_subscriptions: dict[str, callable] = {}  # Device /commands subscriptions
+        
+        # Subscription mode is fixed for the lifetime of the coordinator
+        # (changing it in the options reloads the entry)
+        self.subscription_mode = entry.options.get(CONF_SUBSCRIPTION_MODE, DEFAULT_SUBSCRIPTION_MODE)
+        
+        # Wildcard mode: exact topic -> (handler, payload encoding) routing table,
+        # and raw retained messages received before their route existed
+        # (replayed on route creation)
+        self._routes: dict[str, tuple[callable, str | None]] = {}
+        self._unrouted_retained: dict[str, bytes] = {}
         
         # Track subscribed devices and macros to handle add/remove
         self._subscribed_devices: set[str] = set()
         self._subscribed_macros: set[str] = set()
         
+        # Bounded, deduplicated device/macro subscription jobs
+        self._scheduler = SubscriptionScheduler(
+            hass, f"{DOMAIN} {self.remote_id}", DEFAULT_SUBSCRIBE_CONCURRENCY
+        )
+        
+        # Outbound queue for macro triggers and device commands
+        self._command_queue = CommandQueue(
+            hass, f"{DOMAIN} {self.remote_id}", self._async_publish
+        )
+        
+        # Persistent catalog snapshot for warm start (entities created before MQTT replays)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}"
+        )
+        # Delayed save not written yet (written on shutdown)
+        self._snapshot_save_pending = False
+        
+        # Set while recorded traffic is replayed (see replay_mode), with the
+        # live state put aside meanwhile
+        self._replaying = False
+        self._replay_live_state: RemoteState | None = None
+        
+        # Macro triggers waiting for their echo, by trigger topic
+        self._pending_macro_commands: dict[str, PendingMacroCommand] = {}
+        
+        # Running command sequences by device name (one task may cover several devices)
+        self._sequence_tasks: dict[str, asyncio.Task] = {}
+        
+        # Last MQTT messages: (topic, payload size, handler seconds, timestamp)
+        self._recent_messages: deque[tuple[str, int, float, float]] = deque(
+            maxlen=RECENT_MESSAGES_SIZE
+        )
+        
+        # Sampled hot-path warnings: key -> (last logged monotonic time, suppressed count)
+        self._log_samples: dict[str, tuple[float, int]] = {}
+        
+        # Per-topic/channel/QoS performance metrics (diagnostics and metrics sensors)
+        self.metrics = MetricsRegistry(HANDLER_LATENCY_BUDGET, MACRO_LATENCY_SAMPLES)
+        self._metrics_timer: callable | None = None
+        
+        # Time from list arrival to every device/macro being fully loaded.
+        # Only command lists received over MQTT count (not the restored
+        # snapshot), and warm starts are flagged so both can be compared.
+        self._catalog_pending_since: float | None = None
+        self._live_commands: set[str] = set()
+        self.catalog_ready_time: float | None = None
+        self.catalog_warm_start = False
+        
         # Battery refresh timer
         self._battery_refresh_timer: callable | None = None
-        self._battery_refresh_interval = 3600  # 1 hour in seconds
+        self._battery_refresh_interval = BATTERY_REFRESH_INTERVAL
         
         # LED light auto-off timer
         self._led_light_timer: callable | None = None
         
-        # Data storage
-        self.data: dict[str, Any] = {
-            "status": STATE_OFFLINE,
-            "battery_level": None,
-            "last_key": None,
-            "running_macro": None,
-            "devices": [],
-            "macros": [],
-            "device_commands": {},
-            "test_status": None,
-            "macro_states": {},  # Store macro states (on/off) from MQTT only
-            "led_light_state": "off",  # RGB ring light state
-            "led_light_duration": 5,  # Default duration in seconds
-        }
+        # Channel listeners keyed by (channel, item key) - key None = whole channel
+        self._channel_listeners: dict[tuple[str, str | None], list[CALLBACK_TYPE]] = {}
+        
+        # Structural catalog listeners by catalog name (CATALOG_DEVICES/CATALOG_MACROS),
+        # called with the delta of each list change that adds, removes or renames items
+        self._catalog_listeners: dict[str, list[Callable[[CatalogDelta], None]]] = {}
+        
+        # Data versions keyed like the listeners, bumped on every notification:
+        # entities memoize derived values until a version they depend on changes
+        self._versions: dict[tuple[str, str | None], int] = {}
+        
+        # Lazily built command attribute views by device name (dropped on change)
+        self._command_views: dict[str, dict[str, Any]] = {}
+        self._compact_command_attributes = DEFAULT_COMPACT_COMMAND_ATTRIBUTES
+        
+        # Fingerprint (length, hash) of the last raw payload processed per list/commands
+        # topic: retained replays that are byte-identical skip the whole pipeline
+        self._payload_fingerprints: dict[str, tuple[int, int]] = {}
+        self._fingerprint_hits = 0
+        self._fingerprint_misses = 0
+        
+        # Number of incoming values ignored because they matched the stored state
+        self._suppressed_updates = 0
+        
+        # Last Key sensor write coalescing (key events themselves are never delayed)
+        self._key_coalesce_window = DEFAULT_KEY_COALESCE_WINDOW
+        self._last_key_written = 0.0
+        self._last_key_flush: callable | None = None
+        
+        # Remote state. The device/macro lists carry the RS90 ID <-> name
+        # indexes (built once per list change) used to key per-item channels
+        # by stable ID and to resolve service calls.
+        self.data = RemoteState()
+        
+        self.async_apply_options()
         
         _LOGGER.info("Coordinator initialized - updates via MQTT only")
 
+    @property
+    def device_id(self) -> str | None:
+        """Return the Home Assistant device ID of the remote."""
+        return self._device_id
+
+    @device_id.setter
+    def device_id(self, device_id: str | None) -> None:
+        """Set the HA device ID and prebuild the key event data template."""
+        self._device_id = device_id
+        self._key_event_data = {
+            "remote_id": self.remote_id,
+            "device_id": device_id,  # HA device ID for device triggers
+        }
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply the options of the config entry."""
+        self._key_coalesce_window = self.entry.options.get(
+            CONF_KEY_COALESCE_WINDOW, DEFAULT_KEY_COALESCE_WINDOW
+        )
+        concurrency = self.entry.options.get(CONF_SUBSCRIBE_CONCURRENCY, DEFAULT_SUBSCRIBE_CONCURRENCY)
+        if concurrency != self._scheduler.concurrency:
+            self._scheduler.set_concurrency(concurrency)
+        
+        # Gaps are configured in milliseconds
+        self._command_queue.default_gap = self.entry.options.get(CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP) / 1000
+        self._command_queue.device_gaps = {
+            rs90_device_id: gap / 1000
+            for rs90_device_id, gap in self.entry.options.get(CONF_DEVICE_COMMAND_GAPS, {}).items()
+        }
+        self._command_queue.coalesce = self.entry.options.get(CONF_COALESCE_COMMANDS, DEFAULT_COALESCE_COMMANDS)
+        
+        compact = self.entry.options.get(
+            CONF_COMPACT_COMMAND_ATTRIBUTES, DEFAULT_COMPACT_COMMAND_ATTRIBUTES
+        )
+        if compact != self._compact_command_attributes:
+            self._compact_command_attributes = compact
+            # Rebuild the attribute views of every commands sensor
+            self._command_views.clear()
+            for device_name in self.data.device_commands:
+                self._async_notify(CHANNEL_COMMANDS, self.data.devices.id_by_name.get(device_name))
+
     @property
     def base_topic(self) -> str:
         """Return base MQTT topic for this remote."""
         return f"{TOPIC_BASE}/{self.remote_id}"
 
+    @callback
+    def async_add_channel_listener(
+        self, channel: str, update_callback: CALLBACK_TYPE, key: str | None = None
+    ) -> CALLBACK_TYPE:
+        """Listen for updates of a single data channel.
+        
+        Args:
+            channel: One of the CHANNEL_* constants
+            update_callback: Called (without arguments) when the channel changes
+            key: Item key (macro ID, device ID, catalog name) to listen to.
+                 None listens to every update of the channel.
+        
+        Returns:
+            Function removing the listener
+        """
+        listeners = self._channel_listeners.setdefault((channel, key), [])
+        listeners.append(update_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            """Remove the channel listener."""
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+            if not listeners and self._channel_listeners.get((channel, key)) is listeners:
+                del self._channel_listeners[(channel, key)]
+        
+        return remove_listener
+    
+    @callback
+    def async_add_catalog_listener(
+        self, catalog: str, delta_callback: Callable[[CatalogDelta], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for structural changes of the device or macro list.
+        
+        Args:
+            catalog: CATALOG_DEVICES or CATALOG_MACROS
+            delta_callback: Called with the added, removed and renamed items.
+                            Never called for reorders or items without an ID.
+        
+        Returns:
+            Function removing the listener
+        """
+        listeners = self._catalog_listeners.setdefault(catalog, [])
+        listeners.append(delta_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            """Remove the catalog listener."""
+            if delta_callback in listeners:
+                listeners.remove(delta_callback)
+        
+        return remove_listener
+    
+    @callback
+    def _async_notify_catalog(self, catalog: str, old: CatalogList, new: CatalogList) -> None:
+        """Notify a list change: structural delta first, then the catalog channel."""
+        if self._replaying:
+            pass  # Replayed lists must not add or remove entities
+        elif delta := new.diff(old):
+            _LOGGER.debug(
+                "Catalog %s delta: %d added, %d removed, %d renamed",
+                catalog, len(delta.added), len(delta.removed), len(delta.renamed)
+            )
+            for delta_callback in list(self._catalog_listeners.get(catalog, ())):
+                delta_callback(delta)
+        self._async_notify(CHANNEL_CATALOG, catalog)
+    
+    def data_version(self, channel: str, key: str | None = None) -> int:
+        """Return the version of a data channel (or of one of its items).
+        
+        The channel version changes on every update of the channel, an item
+        version only when that item changes.
+        """
+        return self._versions.get((channel, key), 0)
+    
+    @callback
+    def _async_notify(self, channel: str, key: str | None = None) -> None:
+        """Notify the listeners of a channel (and of the given item key)."""
+        versions = self._versions
+        versions[(channel, None)] = versions.get((channel, None), 0) + 1
+        listeners = list(self._channel_listeners.get((channel, None), ()))
+        if key is not None:
+            versions[(channel, key)] = versions.get((channel, key), 0) + 1
+            listeners.extend(self._channel_listeners.get((channel, key), ()))
+        self.metrics.record_fanout(channel, len(listeners))
+        for update_callback in listeners:
+            update_callback()
+
+    @callback
+    def _async_update_value(
+        self,
+        container: dict[str, Any],
+        key: str,
+        value: Any,
+        channel: str,
+        channel_key: str | None = None,
+    ) -> bool:
+        """Store a value and notify its channel, unless it is unchanged.
+        
+        Retained messages are replayed on every broker reconnect, so most
+        incoming values equal the stored ones and must not rewrite entities.
+        
+        Returns:
+            True if the value changed and listeners were notified
+        """
+        if key in container and container[key] == value:
+            self._suppressed_updates += 1
+            return False
+        container[key] = value
+        self._async_notify(channel, channel_key)
+        return True
+
+    @callback
+    def _async_set_macro_state(self, macro_name: str, state: str) -> bool:
+        """Store the state of a macro and notify its channel, unless it is unchanged.
+        
+        Returns:
+            True if the state changed and listeners were notified
+        """
+        if not self.data.set_macro_state(macro_name, state):
+            self._suppressed_updates += 1
+            return False
+        self._async_notify(CHANNEL_MACRO_STATE, self.data.macros.id_by_name.get(macro_name))
+        return True
+
     async def async_config_entry_first_refresh(self) -> None:
         """Perform first refresh and subscribe to MQTT topics."""
+        # Restore the last known catalog so entities exist before MQTT data arrives
+        await self._async_load_snapshot()
+        
         # Subscribe to MQTT topics
         await self._subscribe_topics()
         await super().async_config_entry_first_refresh()
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    async def _async_load_snapshot(self) -> None:
+        """Load the persisted catalog snapshot.
+        
+        Live MQTT data reconciles it afterwards: unchanged lists are not
+        notified again, changed ones update the entities as usual.
+        """
+        try:
+            snapshot = await self._store.async_load()
+        except Exception as err:  # noqa: BLE001 - a corrupt snapshot must not block setup
+            _LOGGER.warning("Could not load catalog snapshot: %s", err)
+            return
+        if not snapshot:
+            _LOGGER.debug("No catalog snapshot for remote %s", self.remote_id)
+            return
+        
+        self.data.devices = CatalogList.from_payload(snapshot.get("devices", []))
+        self.data.macros = CatalogList.from_payload(snapshot.get("macros", []))
+        self.data.device_commands = {
+            device_name: commands_from_payload(commands)
+            for device_name, commands in snapshot.get("device_commands", {}).items()
+        }
+        _LOGGER.info(
+            "Restored catalog snapshot: %d devices, %d macros",
+            len(self.data.devices), len(self.data.macros)
+        )
+        self.catalog_warm_start = True
+
+    @callback
+    def _async_schedule_snapshot_save(self) -> None:
+        """Persist the catalog after a delay (bursts are written once)."""
+        if self._replaying:
+            return
+        self._snapshot_save_pending = True
+        self._store.async_delay_save(self._snapshot_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _snapshot_data(self) -> dict[str, Any]:
+        """Return the catalog data to persist (live state, even during a replay)."""
+        self._snapshot_save_pending = False
+        state = self._replay_live_state if self._replay_live_state is not None else self.data
+        return {
+            "devices": state.devices.as_list(),
+            "macros": state.macros.as_list(),
+            "device_commands": {
+                device_name: [command._asdict() for command in commands]
+                for device_name, commands in state.device_commands.items()
+            },
+        }
+
+    async def _async_update_data(self) -> RemoteState:
         """Fetch data - returns current data as updates come from MQTT."""
         # No polling needed - all updates come via MQTT callbacks
         # This method is called during initial setup and returns current data
@@ -99,22 +460,47 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         """Subscribe to MQTT topics."""
         _LOGGER.debug("Subscribing to MQTT topics for remote %s", self.remote_id)
         
+        if self.subscription_mode == SUBSCRIPTION_MODE_WILDCARD:
+            # Single broker subscription - every topic below is a routing table entry.
+            # Payloads arrive as raw bytes and are decoded per route.
+            wildcard_topic = f"{self.base_topic}/#"
+            _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=0", wildcard_topic)
+            try:
+                self._subscriptions.append(
+                    await mqtt.async_subscribe(
+                        self.hass, wildcard_topic, self._route_message, qos=0, encoding=None
+                    )
+                )
+                _LOGGER.info("SUCCESS: Subscribed to wildcard topic: %s", wildcard_topic)
+            except Exception as err:
+                _LOGGER.error("✗ Failed to subscribe to topic %s: %s", wildcard_topic, err)
+        elif self.subscription_mode == SUBSCRIPTION_MODE_SHARED:
+            # The domain hub owns the single Haptique/+/# subscription and
+            # feeds this remote's messages to the routing table below
+            try:
+                self._subscriptions.append(await async_get_hub(self.hass).async_register(self))
+                _LOGGER.info("SUCCESS: Registered remote %s with the shared MQTT hub", self.remote_id)
+            except Exception as err:
+                _LOGGER.error("✗ Failed to register with the shared MQTT hub: %s", err)
+        
         # Subscribe to status topic
         await self._subscribe(
             f"{self.base_topic}/{TOPIC_STATUS}",
             self._handle_status
         )
         
-        # Subscribe to device list
+        # Subscribe to device list (raw bytes, decoded straight from JSON)
         await self._subscribe(
             f"{self.base_topic}/{TOPIC_DEVICE_LIST}",
-            self._handle_device_list
+            self._handle_device_list,
+            encoding=None
         )
         
-        # Subscribe to macro list
+        # Subscribe to macro list (raw bytes, decoded straight from JSON)
         await self._subscribe(
             f"{self.base_topic}/{TOPIC_MACRO_LIST}",
-            self._handle_macro_list
+            self._handle_macro_list,
+            encoding=None
         )
         
         # Subscribe to battery level (receives value after publishing to battery/status)
@@ -122,7 +508,6 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             f"{self.base_topic}/{TOPIC_BATTERY_LEVEL}",
             self._handle_battery
         )
-        _LOGGER.info("Subscribed to battery_level topic")
         
         # Subscribe to key events
         await self._subscribe(
@@ -139,7 +524,7 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         # Request initial battery level by publishing to battery/status
         # This triggers the remote to publish the value on battery_level
         battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
-        _LOGGER.info("Publishing to %s to trigger battery level update", battery_trigger_topic)
+        _LOGGER.debug("Publishing to %s to trigger battery level update", battery_trigger_topic)
         try:
             _LOGGER.debug("MQTT PUBLISH: topic='%s', payload='', qos=0, retain=False", battery_trigger_topic)
             await mqtt.async_publish(
@@ -149,14 +534,27 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 qos=0,  # QoS 0 for monitoring requests (Haptique best practice)
                 retain=False
             )
-            _LOGGER.info("SUCCESS: Battery level trigger published successfully")
+            _LOGGER.debug("SUCCESS: Battery level trigger published successfully")
         except Exception as err:
             _LOGGER.error("✗ Failed to publish battery trigger: %s", err)
         
-        # Start periodic battery refresh timer
-        self._start_battery_refresh_timer()
+        # Start periodic battery refresh timer (the hub runs a single one in shared mode)
+        if self.subscription_mode != SUBSCRIPTION_MODE_SHARED:
+            self._start_battery_refresh_timer()
+        
+        # Refresh the (disabled by default) metrics sensors periodically
+        self._metrics_timer = async_track_time_interval(
+            self.hass, self._async_update_metrics, timedelta(seconds=METRICS_UPDATE_INTERVAL)
+        )
 
-    async def _subscribe(self, topic: str, callback_func: callable, qos: int = 0, add_to_global: bool = True) -> callable:
+    async def _subscribe(
+        self,
+        topic: str,
+        callback_func: callable,
+        qos: int = 0,
+        add_to_global: bool = True,
+        encoding: str | None = "utf-8",
+    ) -> callable:
         """Subscribe to an MQTT topic.
         
         Args:
@@ -166,121 +564,380 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                  Default is 0 as per Haptique best practices for monitoring
             add_to_global: If True, add to global subscriptions list for shutdown
                           Set to False for subscriptions managed separately (e.g., macros)
+            encoding: Payload encoding, None to receive the raw bytes (JSON
+                      topics: decoded without an intermediate str)
         
         Returns:
             Unsubscribe function
+        
+        In wildcard and shared modes no broker subscription is made: the topic
+        is only added to the routing table of the wildcard subscription. In per-topic
+        mode the topic is routed too, so injected (replayed) messages reach
+        the same handler. During a replay only the route is added.
         """
+        self.metrics.record_subscribe()
+        if self.subscription_mode != SUBSCRIPTION_MODE_PER_TOPIC or self._replaying:
+            # Replayed lists only need routes for the injected messages
+            return self._add_route(topic, callback_func, add_to_global, encoding)
+        
         @callback
         def message_received(msg):
             """Handle new MQTT message."""
-            # msg.payload is already a string (decoded by Home Assistant)
-            payload_str = str(msg.payload)[:100] if msg.payload else ""
-            _LOGGER.debug("MQTT received on '%s': payload='%s' (len=%d)", 
-                         topic, payload_str, len(msg.payload) if msg.payload else 0)
-            callback_func(msg.payload)
+            self._async_handle_message(topic, callback_func, msg.payload)
         
         _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=%d", topic, qos)
-        _LOGGER.info("Attempting to subscribe to MQTT topic: %s (QoS %d)", topic, qos)
         try:
-            unsubscribe = await mqtt.async_subscribe(
-                self.hass, topic, message_received, qos=qos
+            unsubscribe_broker = await mqtt.async_subscribe(
+                self.hass, topic, message_received, qos=qos, encoding=encoding
             )
+            remove_route = self._add_route(topic, callback_func, False, encoding)
+            
+            @callback
+            def unsubscribe() -> None:
+                """Unsubscribe from the broker and remove the route."""
+                unsubscribe_broker()
+                remove_route()
+            
             # Only add to global list if requested (avoid double-tracking)
             if add_to_global:
                 self._subscriptions.append(unsubscribe)
-            _LOGGER.info("SUCCESS: Successfully subscribed to topic: %s (QoS %d)", topic, qos)
+            _LOGGER.debug("SUCCESS: Successfully subscribed to topic: %s (QoS %d)", topic, qos)
             return unsubscribe
         except Exception as err:
             _LOGGER.error("✗ Failed to subscribe to topic %s: %s", topic, err)
             return None
 
+    @callback
+    def _add_route(
+        self,
+        topic: str,
+        callback_func: callable,
+        add_to_global: bool = True,
+        encoding: str | None = "utf-8",
+    ) -> callable:
+        """Add a topic to the routing table (wildcard subscription and injected messages).
+        
+        Returns:
+            Function removing the route
+        """
+        route = (callback_func, encoding)
+        self._routes[topic] = route
+        _LOGGER.debug("Added route for topic: %s (%d routes)", topic, len(self._routes))
+        
+        @callback
+        def remove_route() -> None:
+            """Remove the route (no broker round trip)."""
+            if self._routes.get(topic) is route:
+                del self._routes[topic]
+        
+        if add_to_global:
+            self._subscriptions.append(remove_route)
+        
+        # Emulate the broker delivering the retained message on subscription
+        payload = self._unrouted_retained.pop(topic, None)
+        if payload is not None:
+            self._dispatch_route(topic, route, payload)
+        
+        return remove_route
+
+    @callback
+    def _route_message(self, msg) -> None:
+        """Dispatch a message of the wildcard subscription to its handler."""
+        route = self._routes.get(msg.topic)
+        if route is None:
+            # Commands/trigger topics of items not routed yet: keep the retained
+            # value so it can be delivered when the route is added
+            if msg.retain:
+                self._unrouted_retained[msg.topic] = msg.payload
+            return
+        self._dispatch_route(msg.topic, route, msg.payload)
+
+    @callback
+    def _dispatch_route(self, topic: str, route: tuple[callable, str | None], payload: bytes) -> None:
+        """Decode a raw wildcard payload as the route expects and call its handler."""
+        handler, encoding = route
+        if encoding is not None:
+            try:
+                payload = payload.decode(encoding)
+            except UnicodeDecodeError:
+                self._log_sampled(
+                    logging.WARNING, f"decode:{topic}",
+                    "Can't decode payload on %s with encoding %s", topic, encoding
+                )
+                return
+        self._async_handle_message(topic, handler, payload)
+
+    @callback
+    def _async_handle_message(self, topic: str, handler: callable, payload: str | bytes) -> None:
+        """Run a message handler and record the message in the ring buffer."""
+        start = time.perf_counter()
+        try:
+            handler(payload)
+        finally:
+            duration = time.perf_counter() - start
+            self._recent_messages.append((topic, len(payload), duration, time.time()))
+            if self.metrics.record_message(topic, len(payload), duration):
+                self._log_sampled(
+                    logging.WARNING, f"budget:{topic}",
+                    "Handler for %s took %.1f ms (budget %.1f ms)",
+                    topic, duration * 1000, HANDLER_LATENCY_BUDGET * 1000
+                )
+
+    @callback
+    def _async_update_metrics(self, _now=None) -> None:
+        """Notify the metrics sensors."""
+        self._async_notify(CHANNEL_METRICS)
+
+    def _log_sampled(self, level: int, key: str, msg: str, *args: Any) -> None:
+        """Log a repeated hot-path message at most once per LOG_SAMPLE_INTERVAL.
+        
+        Occurrences in between are only counted, and the count is appended to
+        the next message logged for the same key.
+        """
+        if not _LOGGER.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        last_logged, suppressed = self._log_samples.get(key, (None, 0))
+        if last_logged is not None and now - last_logged < LOG_SAMPLE_INTERVAL:
+            self._log_samples[key] = (last_logged, suppressed + 1)
+            return
+        self._log_samples[key] = (now, 0)
+        if suppressed:
+            msg = f"{msg} (%d similar messages suppressed)"
+            args = (*args, suppressed)
+        _LOGGER.log(level, msg, *args)
+
     @callback
     def _handle_status(self, payload: str) -> None:
         """Handle status message."""
         status = payload.strip()
-        old_status = self.data.get("status")
+        old_status = self.data.status
         
         if status != old_status:
             _LOGGER.info("Status changed: %s → %s", old_status, status)
-            self.data["status"] = status
-            self.async_set_updated_data(self.data)
+            self.data.status = status
+            self._async_notify(CHANNEL_STATUS)
         else:
+            self._suppressed_updates += 1
             _LOGGER.debug("Status unchanged: %s", status)
 
     @callback
-    def _handle_device_list(self, payload: str) -> None:
+    def async_inject_message(
+        self, topic: str, payload: bytes, qos: int = 0, retain: bool = False
+    ) -> None:
+        """Route a message as if it had been received from the broker.
+        
+        Args:
+            topic: Topic relative to the base topic of the remote (e.g. "device/list")
+            payload: Raw payload
+        """
+        self._route_message(MQTTMessage(f"{self.base_topic}/{topic}", payload, qos, retain))
+
+    def get_device_name(self, rs90_device_id: str) -> str | None:
+        """Return the name of a device from its stable RS90 ID."""
+        return self.data.devices.name_by_id.get(rs90_device_id)
+
+    def get_macro_name(self, rs90_macro_id: str) -> str | None:
+        """Return the name of a macro from its stable RS90 ID."""
+        return self.data.macros.name_by_id.get(rs90_macro_id)
+
+    @callback
+    def _async_payload_unchanged(self, topic: str, payload: bytes) -> bool:
+        """Return True if the payload is identical to the last one processed on topic."""
+        fingerprint = (len(payload), hash(payload))
+        if self._payload_fingerprints.get(topic) == fingerprint:
+            self._fingerprint_hits += 1
+            return True
+        self._payload_fingerprints[topic] = fingerprint
+        self._fingerprint_misses += 1
+        return False
+
+    @callback
+    def _handle_device_list(self, payload: bytes) -> None:
         """Handle device list message and manage subscriptions."""
+        if self._async_payload_unchanged(TOPIC_DEVICE_LIST, payload):
+            _LOGGER.debug("Device list payload unchanged - skipping")
+            return
         try:
-            devices = json.loads(payload)
+            devices = json_loads(payload)
             _LOGGER.debug("Received device list: %s", devices)
             
             # Normalize ID field (handle both "id" and "Id")
-            normalized_devices = []
-            current_device_names = set()
+            old_devices = self.data.devices
+            normalized_devices = CatalogList.from_payload(devices)
+            current_device_names = normalized_devices.names
             
-            for device in devices:
-                normalized_device = {
-                    "id": device.get("id") or device.get("Id"),
-                    "name": device.get("name")
-                }
-                normalized_devices.append(normalized_device)
-                device_name = normalized_device.get("name")
-                if device_name:
-                    current_device_names.add(device_name)
-            
-            self.data["devices"] = normalized_devices
-            _LOGGER.debug("Normalized devices: %s", normalized_devices)
+            devices_changed = normalized_devices.items != old_devices.items
+            if devices_changed:
+                self.data.devices = normalized_devices
+            _LOGGER.debug("Normalized devices: %s", normalized_devices.items)
             
             # Detect new devices (not yet subscribed)
             new_devices = current_device_names - self._subscribed_devices
             
-            # Detect removed devices (subscribed but not in current list)
-            removed_devices = self._subscribed_devices - current_device_names
+            # Detect removed devices (subscribed or restored from the snapshot,
+            # but not in current list)
+            removed_devices = (
+                self._subscribed_devices | self.data.device_commands.keys()
+            ) - current_device_names
             
             # Subscribe to new devices
+            if new_devices:
+                self._async_mark_catalog_pending()
             for device_name in new_devices:
                 _LOGGER.info("NEW: New device detected: %s - subscribing to details", device_name)
-                asyncio.create_task(
-                    self._subscribe_device_details(device_name)
-                )
-                self._subscribed_devices.add(device_name)
+                self._async_schedule_device_details(device_name)
             
             # Clean up removed devices
             for device_name in removed_devices:
                 _LOGGER.info("🗑️ Device removed: %s - cleaning up", device_name)
-                self._subscribed_devices.discard(device_name)
-                # Remove commands from storage
-                if device_name in self.data["device_commands"]:
-                    del self.data["device_commands"][device_name]
-                    _LOGGER.debug("Removed commands for deleted device: %s", device_name)
+                self._async_remove_device(device_name, old_devices.id_by_name.get(device_name))
             
-            self.async_set_updated_data(self.data)
-        except json.JSONDecodeError:
+            if devices_changed:
+                self._async_notify_catalog(CATALOG_DEVICES, old_devices, normalized_devices)
+                self._async_schedule_snapshot_save()
+            else:
+                self._suppressed_updates += 1
+                _LOGGER.debug("Device list unchanged - skipping entity update")
+            self._async_check_catalog_complete()
+        except ValueError:
             _LOGGER.error("Failed to parse device list: %s", payload)
 
     @callback
-    def _handle_macro_list(self, payload: str) -> None:
+    def _async_remove_device(self, device_name: str, rs90_device_id: str | None) -> None:
+        """Unsubscribe and unroute the /commands topic of a removed device and drop its commands."""
+        self._subscribed_devices.discard(device_name)
+        self._live_commands.discard(device_name)
+        commands_topic = f"device/{device_name}/commands"
+        if (unsubscribe := self._device_subscriptions.pop(device_name, None)) is not None:
+            _LOGGER.debug("MQTT UNSUBSCRIBE: topic='%s/%s'", self.base_topic, commands_topic)
+            unsubscribe()
+        self._unrouted_retained.pop(f"{self.base_topic}/{commands_topic}", None)
+        # Forget the commands fingerprint so a re-added device is processed again
+        self._payload_fingerprints.pop(commands_topic, None)
+        # Remove commands from storage
+        if device_name in self.data.device_commands:
+            del self.data.device_commands[device_name]
+            self._command_views.pop(device_name, None)
+            _LOGGER.debug("Removed commands for deleted device: %s", device_name)
+            self._async_notify(CHANNEL_COMMANDS, rs90_device_id)
+
+    @callback
+    def _async_remove_macro(self, macro_name: str, rs90_macro_id: str | None) -> None:
+        """Unsubscribe the trigger topic of a removed macro and drop its state."""
+        self._subscribed_macros.discard(macro_name)
+        
+        # Unsubscribe from this macro's trigger topic
+        trigger_topic = f"{self.base_topic}/macro/{macro_name}/trigger"
+        if macro_name in self._macro_subscriptions:
+            _LOGGER.debug("MQTT UNSUBSCRIBE: topic='%s'", trigger_topic)
+            unsubscribe_func = self._macro_subscriptions.pop(macro_name)
+            unsubscribe_func()
+            _LOGGER.info("SUCCESS: Unsubscribed from macro trigger: %s", macro_name)
+        else:
+            _LOGGER.warning("WARNING: Macro %s not found in subscriptions dict!", macro_name)
+        
+        # Remove state from memory
+        if self.data.remove_macro_state(macro_name):
+            _LOGGER.debug("Removed state for deleted macro: %s", macro_name)
+            self._async_notify(CHANNEL_MACRO_STATE, rs90_macro_id)
+
+    @contextmanager
+    def replay_mode(self) -> Iterator[None]:
+        """Feed recorded traffic through the handlers without keeping its effects.
+        
+        The handlers work on a scratch copy of the state: replayed lists do
+        not add or remove entities and are not persisted. On exit the real
+        state, payload fingerprints and live command receipts are restored, the entities re-render
+        it and the device/macro subscriptions are reconciled with it.
+        Live messages received meanwhile only update the scratch state.
+        
+        Nothing is sent to the broker: the device/macro subscriptions of the
+        replayed lists are routes of a scratch routing table (no broker
+        subscription, no detail request), dropped on exit. The real
+        subscriptions and the retained messages kept for unrouted topics
+        are left untouched.
+        """
+        if self._replaying:
+            raise ValueError("A replay is already running for this remote")
+        state = self.data
+        fingerprints = dict(self._payload_fingerprints)
+        live_commands = set(self._live_commands)
+        unrouted_retained = self._unrouted_retained
+        routes = self._routes
+        subscribed_devices, device_subscriptions = self._subscribed_devices, self._device_subscriptions
+        subscribed_macros, macro_subscriptions = self._subscribed_macros, self._macro_subscriptions
+        self._replaying = True
+        self._replay_live_state = state
+        self.data = state.copy()
+        self._unrouted_retained = {}
+        self._routes = dict(routes)
+        self._subscribed_devices, self._device_subscriptions = set(subscribed_devices), {}
+        self._subscribed_macros, self._macro_subscriptions = set(subscribed_macros), {}
+        try:
+            yield
+        finally:
+            for unsubscribe in (
+                *self._device_subscriptions.values(), *self._macro_subscriptions.values()
+            ):
+                unsubscribe()
+            self._replaying = False
+            self._replay_live_state = None
+            self.data = state
+            self._payload_fingerprints = fingerprints
+            self._live_commands = live_commands
+            self._unrouted_retained = unrouted_retained
+            self._routes = routes
+            self._device_subscriptions = device_subscriptions
+            self._macro_subscriptions = macro_subscriptions
+            # Jobs that were subscribing when the replay started stored their
+            # subscription in the scratch tables: they are subscribed again
+            self._subscribed_devices = subscribed_devices & device_subscriptions.keys()
+            self._subscribed_macros = subscribed_macros & macro_subscriptions.keys()
+            self._command_views.clear()
+            self._async_notify_all()
+            self._async_reconcile_subscriptions()
+
+    @callback
+    def _async_notify_all(self) -> None:
+        """Bump every data version and notify every listener once."""
+        for version_key in self._versions:
+            self._versions[version_key] += 1
+        for listeners in list(self._channel_listeners.values()):
+            for update_callback in list(listeners):
+                update_callback()
+
+    @callback
+    def _async_reconcile_subscriptions(self) -> None:
+        """Match the device/macro subscriptions to the current lists."""
+        for device_name in self._subscribed_devices - self.data.devices.names:
+            self._async_remove_device(device_name, None)
+        for macro_name in self._subscribed_macros - self.data.macros.names:
+            self._async_remove_macro(macro_name, None)
+        for device_name in self.data.devices.names - self._subscribed_devices:
+            self._async_schedule_device_details(device_name)
+        for macro_name in self.data.macros.names - self._subscribed_macros:
+            self._async_schedule_macro_trigger(macro_name)
+
+    @callback
+    def _handle_macro_list(self, payload: bytes) -> None:
         """Handle macro list message and manage subscriptions."""
+        if self._async_payload_unchanged(TOPIC_MACRO_LIST, payload):
+            _LOGGER.debug("Macro list payload unchanged - skipping")
+            return
         try:
-            macros = json.loads(payload)
+            macros = json_loads(payload)
             _LOGGER.debug("Received macro list: %s", macros)
             
             # Normalize ID field (handle both "id" and "Id")
-            normalized_macros = []
-            current_macro_names = set()
+            old_macros = self.data.macros
+            normalized_macros = CatalogList.from_payload(macros)
+            current_macro_names = normalized_macros.names
             
-            for macro in macros:
-                normalized_macro = {
-                    "id": macro.get("id") or macro.get("Id"),
-                    "name": macro.get("name")
-                }
-                normalized_macros.append(normalized_macro)
-                macro_name = normalized_macro.get("name")
-                if macro_name:
-                    current_macro_names.add(macro_name)
-            
-            self.data["macros"] = normalized_macros
-            _LOGGER.debug("Normalized macros: %s", normalized_macros)
+            macros_changed = normalized_macros.items != old_macros.items
+            if macros_changed:
+                self.data.macros = normalized_macros
+            _LOGGER.debug("Normalized macros: %s", normalized_macros.items)
             
             # Detect new macros (not yet subscribed)
             new_macros = current_macro_names - self._subscribed_macros
@@ -292,36 +949,26 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                          current_macro_names, self._subscribed_macros, removed_macros)
             
             # Subscribe to new macros
+            if new_macros:
+                self._async_mark_catalog_pending()
             for macro_name in new_macros:
                 _LOGGER.info("NEW: New macro detected: %s - subscribing to trigger", macro_name)
-                asyncio.create_task(
-                    self._subscribe_macro_trigger(macro_name)
-                )
+                self._async_schedule_macro_trigger(macro_name)
                 # Note: macro_name will be added to _subscribed_macros inside _subscribe_macro_trigger()
             
             # Clean up removed macros
             for macro_name in removed_macros:
                 _LOGGER.info("🗑️ Macro removed: %s - cleaning up", macro_name)
-                self._subscribed_macros.discard(macro_name)
-                
-                # Unsubscribe from this macro's trigger topic
-                trigger_topic = f"{self.base_topic}/macro/{macro_name}/trigger"
-                _LOGGER.debug("Checking macro_subscriptions dict, keys: %s", list(self._macro_subscriptions.keys()))
-                if macro_name in self._macro_subscriptions:
-                    _LOGGER.debug("MQTT UNSUBSCRIBE: topic='%s'", trigger_topic)
-                    unsubscribe_func = self._macro_subscriptions.pop(macro_name)
-                    unsubscribe_func()
-                    _LOGGER.info("SUCCESS: Unsubscribed from macro trigger: %s", macro_name)
-                else:
-                    _LOGGER.warning("WARNING: Macro %s not found in subscriptions dict!", macro_name)
-                
-                # Remove state from memory
-                if macro_name in self.data["macro_states"]:
-                    del self.data["macro_states"][macro_name]
-                    _LOGGER.debug("Removed state for deleted macro: %s", macro_name)
+                self._async_remove_macro(macro_name, old_macros.id_by_name.get(macro_name))
             
-            self.async_set_updated_data(self.data)
-        except json.JSONDecodeError:
+            if macros_changed:
+                self._async_notify_catalog(CATALOG_MACROS, old_macros, normalized_macros)
+                self._async_schedule_snapshot_save()
+            else:
+                self._suppressed_updates += 1
+                _LOGGER.debug("Macro list unchanged - skipping entity update")
+            self._async_check_catalog_complete()
+        except ValueError:
             _LOGGER.error("Failed to parse macro list: %s", payload)
 
     @callback
@@ -344,7 +991,6 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                     battery_level = int(battery_str)
             # Format 3: Any text with a number (fallback)
             else:
-                import re
                 numbers = re.findall(r'\d+', payload)
                 if numbers:
                     battery_level = int(numbers[0])
@@ -352,72 +998,198 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             if battery_level is not None:
                 # Clamp to 0-100
                 battery_level = max(0, min(100, battery_level))
-                _LOGGER.info("Battery level updated: %d%%", battery_level)
-                self.data["battery_level"] = battery_level
-                self.async_set_updated_data(self.data)
+                if battery_level != self.data.battery_level:
+                    self.data.battery_level = battery_level
+                    self._async_notify(CHANNEL_BATTERY)
+                    _LOGGER.debug("Battery level updated: %d%%", battery_level)
+                else:
+                    self._suppressed_updates += 1
             else:
-                _LOGGER.warning("Could not parse battery level from: %s", payload)
+                self._log_sampled(
+                    logging.WARNING, "battery", "Could not parse battery level from: %s", payload
+                )
         except (ValueError, TypeError) as err:
             _LOGGER.error("Failed to parse battery level: %s - %s", payload, err)
 
     @callback
     def _handle_keys(self, payload: str) -> None:
-        """Handle key press events."""
-        try:
-            # Payload format: "button:#"
-            if "button:" in payload:
-                button_num = payload.split("button:")[1].strip()
-                _LOGGER.debug("Key pressed: button %s", button_num)
-                
-                # Fire Home Assistant event for EVERY key press (including duplicates)
-                # This allows automations to trigger on repeated button presses
-                self.hass.bus.async_fire(
-                    f"{DOMAIN}_key_pressed",
-                    {
-                        "remote_id": self.remote_id,
-                        "device_id": self.device_id,  # HA device ID for device triggers
-                        "button": int(button_num),
-                        "timestamp": time.time(),  # Ensures uniqueness
-                    }
-                )
-                _LOGGER.debug("Fired event: %s_key_pressed with button %s", DOMAIN, button_num)
-                
-                # Update sensor state (for backward compatibility)
-                self.data["last_key"] = button_num
-                self.async_set_updated_data(self.data)
-            else:
-                _LOGGER.warning("Unexpected key payload format: %s", payload)
-        except (IndexError, AttributeError) as err:
-            _LOGGER.error("Failed to parse key event: %s - %s", payload, err)
+        """Handle key press events.
+        
+        Hot path: holding a key produces 10-20 messages per second. The event
+        is fired first for EVERY key press (including duplicates) so that
+        automations never wait behind entity writes; the Last Key sensor
+        write is coalesced.
+        """
+        match = _KEY_PAYLOAD_RE.search(payload)
+        if match is None:
+            self._log_sampled(logging.WARNING, "keys", "Unexpected key payload format: %s", payload)
+            return
+        
+        button_num = match.group(1)
+        self.hass.bus.async_fire(
+            self._key_event_type,
+            {
+                **self._key_event_data,
+                "button": int(button_num),
+                "timestamp": time.time(),  # Ensures uniqueness
+            },
+        )
+        _LOGGER.debug("Key pressed: button %s", button_num)
+        
+        # Update sensor state (for backward compatibility)
+        self.data.last_key = button_num
+        self._async_schedule_last_key_write()
+
+    @callback
+    def _async_schedule_last_key_write(self) -> None:
+        """Write the Last Key sensor at most once per coalescing window.
+        
+        The first press of a burst is written immediately, the following ones
+        are folded into a single trailing write at the end of the window.
+        """
+        if self._last_key_flush is not None:
+            return  # Trailing write already scheduled, it will pick up the latest key
+        
+        delay = self._last_key_written + self._key_coalesce_window - time.monotonic()
+        if delay <= 0:
+            self._async_flush_last_key()
+        else:
+            self._last_key_flush = async_call_later(
+                self.hass, delay, self._async_flush_last_key
+            )
+
+    @callback
+    def _async_flush_last_key(self, _now=None) -> None:
+        """Notify the Last Key sensor of the latest key press."""
+        self._last_key_flush = None
+        self._last_key_written = time.monotonic()
+        self._async_notify(CHANNEL_KEYS)
 
     @callback
     def _handle_test_status(self, payload: str) -> None:
         """Handle test status message (running macro info)."""
         _LOGGER.debug("Test status: %s", payload)
-        self.data["test_status"] = payload
         
         # Try to extract running macro/device info
         # Format: "Pioneer - VSX/SC Series - Off 200"
-        if payload and payload != "":
-            self.data["running_macro"] = payload
+        self.data.running_macro = payload or None
+        if payload != self.data.test_status:
+            self.data.test_status = payload
+            self._async_notify(CHANNEL_TEST_STATUS)
         else:
-            self.data["running_macro"] = None
-            
-        self.async_set_updated_data(self.data)
+            self._suppressed_updates += 1
+
+    @callback
+    def _async_schedule_device_details(self, device_name: str) -> asyncio.Task:
+        """Schedule the commands subscription and details request of a device."""
+        self._subscribed_devices.add(device_name)
+        return self._scheduler.async_schedule(
+            f"device:{device_name}", partial(self._subscribe_device_details, device_name)
+        )
+
+    @callback
+    def _async_schedule_macro_trigger(self, macro_name: str) -> asyncio.Task:
+        """Schedule the trigger subscription of a macro."""
+        return self._scheduler.async_schedule(
+            f"macro:{macro_name}", partial(self._subscribe_macro_trigger, macro_name)
+        )
+
+    @callback
+    def _async_mark_catalog_pending(self) -> None:
+        """Start timing catalog completion (kept from the first pending list)."""
+        if self._catalog_pending_since is None:
+            self._catalog_pending_since = time.monotonic()
+
+    @callback
+    def _async_check_catalog_complete(self) -> None:
+        """Record the catalog load time once every device and macro is loaded."""
+        if self._catalog_pending_since is None:
+            return
+        if not self.data.devices.names <= self._live_commands:
+            return
+        if not self.data.macros.names <= self._subscribed_macros:
+            return
+        
+        self.catalog_ready_time = time.monotonic() - self._catalog_pending_since
+        self._catalog_pending_since = None
+        _LOGGER.info(
+            "Catalog complete in %.2f s (%s start, %d devices, %d macros)",
+            self.catalog_ready_time, "warm" if self.catalog_warm_start else "cold",
+            len(self.data.devices), len(self.data.macros)
+        )
 
     async def _subscribe_device_details(self, device_name: str) -> None:
         """Subscribe to device commands topic and request details.
         
         According to actual RS90 behavior:
-        1. Publish empty payload to device/{name}/detail to request commands
-        2. Subscribe to device/{name}/commands to receive the command list
+        1. Subscribe to device/{name}/commands to receive the command list
+        2. Publish empty payload to device/{name}/detail to request commands
+        
+        Subscribing first guarantees the reply to the request cannot be missed
+        (in wildcard mode the route must exist before the message arrives).
         
         Note: This differs from Haptique documentation which suggests
         subscribing to /detail directly. See bug report for details.
         """
-        # Step 1: Request device details by publishing empty payload to /detail
+        commands_topic = f"{self.base_topic}/device/{device_name}/commands"
+        
+        @callback
+        def handle_device_commands(payload: bytes) -> None:
+            """Handle device commands message."""
+            _LOGGER.debug("Received payload on /commands for device '%s' (len=%d)", device_name, len(payload))
+            
+            if self._async_payload_unchanged(f"device/{device_name}/commands", payload):
+                _LOGGER.debug("Commands payload unchanged for '%s' - skipping", device_name)
+                self._live_commands.add(device_name)
+                self._async_check_catalog_complete()
+                return
+            
+            # FIX v1.2.8: Handle empty payloads properly (device removed or no commands)
+            if not payload.strip():
+                _LOGGER.debug("Received empty payload for device '%s' - clearing commands", device_name)
+                self._async_set_device_commands(device_name, ())
+                self._live_commands.add(device_name)
+                self._async_check_catalog_complete()
+                return
+            
+            try:
+                commands = json_loads(payload)
+                _LOGGER.debug("SUCCESS: Received %d commands for device '%s'", len(commands), device_name)
+                
+                # Normalize ID field (handle both "id", "Id", "ID") into compact records
+                normalized_commands = commands_from_payload(commands)
+                
+                if self._async_set_device_commands(device_name, normalized_commands):
+                    _LOGGER.debug("SUCCESS: Stored %d normalized commands for '%s'", len(normalized_commands), device_name)
+                else:
+                    _LOGGER.debug("Commands unchanged for '%s'", device_name)
+                self._live_commands.add(device_name)
+                self._async_check_catalog_complete()
+            except ValueError as err:
+                _LOGGER.error("Failed to parse device commands for %s: %s - Error: %s", device_name, payload, err)
+        
+        # Step 1: Subscribe to /commands topic (where RS90 actually publishes the retained message)
+        # Tracked per device (not globally) so a removed device is unsubscribed
+        unsubscribe = await self._subscribe(
+            commands_topic, handle_device_commands, add_to_global=False, encoding=None
+        )
+        if unsubscribe is None:
+            return
+        if device_name not in self._subscribed_devices:
+            # Removed from the list while subscribing
+            unsubscribe()
+            return
+        if (previous := self._device_subscriptions.pop(device_name, None)) is not None:
+            previous()
+        self._device_subscriptions[device_name] = unsubscribe
+        _LOGGER.debug("SUCCESS: Subscribed to retained commands topic: %s", commands_topic)
+        
+        # Step 2: Request device details by publishing empty payload to /detail
+        # (not for a replayed list: nothing is sent to the remote)
+        if self._replaying:
+            return
         detail_topic = f"{self.base_topic}/device/{device_name}/detail"
-        _LOGGER.info("Requesting device details for '%s' via topic: %s", device_name, detail_topic)
+        _LOGGER.debug("Requesting device details for '%s' via topic: %s", device_name, detail_topic)
         _LOGGER.debug("MQTT PUBLISH (REQUEST DETAILS): topic='%s', payload='', qos=0, retain=False", detail_topic)
         
         try:
@@ -428,51 +1200,51 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 qos=0,
                 retain=False
             )
-            _LOGGER.info("SUCCESS: Device details request published for: %s", device_name)
+            _LOGGER.debug("SUCCESS: Device details request published for: %s", device_name)
         except Exception as err:
             _LOGGER.error("✗ Failed to publish device details request for %s: %s", device_name, err)
-            return
+
+    @callback
+    def _async_set_device_commands(self, device_name: str, commands: tuple[RS90Command, ...]) -> bool:
+        """Store the command catalog of a device if it changed.
         
-        # Step 2: Subscribe to /commands topic to receive the command list
-        commands_topic = f"{self.base_topic}/device/{device_name}/commands"
+        Returns:
+            True if the catalog changed and listeners were notified
+        """
+        if self.data.device_commands.get(device_name) != commands:
+            # Drop the cached view before listeners render the new catalog
+            self._command_views.pop(device_name, None)
+        if not self._async_update_value(
+            self.data.device_commands, device_name, commands,
+            CHANNEL_COMMANDS, self.data.devices.id_by_name.get(device_name)
+        ):
+            return False
+        self._async_schedule_snapshot_save()
+        return True
+
+    def get_command_attributes(self, device_name: str) -> dict[str, Any]:
+        """Return the command attributes of a device (built once per catalog change)."""
+        if (view := self._command_views.get(device_name)) is not None:
+            return view
         
-        @callback
-        def handle_device_commands(payload: str) -> None:
-            """Handle device commands message."""
-            _LOGGER.debug("Received payload on /commands for device '%s': %s", device_name, payload[:200] if payload else "None")
-            
-            # FIX v1.2.8: Handle empty payloads properly (device removed or no commands)
-            if not payload or payload.strip() == "":
-                _LOGGER.debug("Received empty payload for device '%s' - clearing commands", device_name)
-                self.data["device_commands"][device_name] = []
-                self.async_set_updated_data(self.data)
-                return
-            
-            try:
-                commands = json.loads(payload)
-                _LOGGER.info("SUCCESS: Received %d commands for device '%s'", len(commands), device_name)
-                
-                # Normalize ID field (handle both "id", "Id", "ID")
-                normalized_commands = []
-                for command in commands:
-                    cmd_id = command.get("id") or command.get("Id") or command.get("ID")
-                    normalized_command = {
-                        "id": cmd_id,
-                        "name": command.get("name")
-                    }
-                    normalized_commands.append(normalized_command)
-                    _LOGGER.debug("Normalized command: id=%s, name=%s", normalized_command.get("id"), normalized_command.get("name"))
-                
-                self.data["device_commands"][device_name] = normalized_commands
-                _LOGGER.info("SUCCESS: Stored %d normalized commands for '%s'", len(normalized_commands), device_name)
-                _LOGGER.debug("Current device_commands keys: %s", list(self.data["device_commands"].keys()))
-                self.async_set_updated_data(self.data)
-            except json.JSONDecodeError as err:
-                _LOGGER.error("Failed to parse device commands for %s: %s - Error: %s", device_name, payload, err)
+        commands = self.data.device_commands.get(device_name, ())
+        command_ids = [command.id for command in commands if command.id]
+        view = {
+            "command_count": len(commands),
+            "commands": command_ids,  # List of all command IDs
+        }
+        # Add each command as a separate attribute for easy access (unless compact:
+        # the full catalog is then available from the get_device_commands service)
+        if not self._compact_command_attributes:
+            for idx, cmd_id in enumerate(command_ids, 1):
+                view[f"command_{idx}"] = cmd_id
         
-        # Subscribe to /commands topic (where RS90 actually publishes the retained message)
-        await self._subscribe(commands_topic, handle_device_commands)
-        _LOGGER.info("SUCCESS: Subscribed to retained commands topic: %s", commands_topic)
+        self._command_views[device_name] = view
+        return view
+
+    def get_device_commands(self, device_name: str) -> list[dict[str, Any]]:
+        """Return the full command catalog of a device (id and name of each command)."""
+        return [command._asdict() for command in self.data.device_commands.get(device_name, ())]
 
     async def _subscribe_macro_trigger(self, macro_name: str) -> None:
         """Subscribe to macro trigger topic for state tracking."""
@@ -486,11 +1258,29 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             
             # Store the macro state in memory only
             if state in ["on", "off"]:
-                self.data["macro_states"][macro_name] = state
-                _LOGGER.info("SUCCESS: Macro '%s' state updated to: %s", macro_name, state)
-                self.async_set_updated_data(self.data)
+                # Confirm a pending trigger before change detection: the echo
+                # of an optimistic state is suppressed as unchanged. The first
+                # matching message after the publish is our own, sent back by
+                # the broker: only a later one comes from the remote.
+                if (pending := self._pending_macro_commands.get(topic)) is not None:
+                    if (
+                        pending.published_at is not None
+                        and pending.broker_echo_at is None
+                        and state == pending.state
+                    ):
+                        pending.broker_echo_at = time.monotonic()
+                        self.metrics.macro_confirmations.broker_echo.record(
+                            pending.broker_echo_at - pending.published_at
+                        )
+                    else:
+                        self._async_confirm_macro_command(topic, pending, state)
+                if self._async_set_macro_state(macro_name, state):
+                    _LOGGER.debug("SUCCESS: Macro '%s' state updated to: %s", macro_name, state)
             else:
-                _LOGGER.warning("Invalid macro state '%s' for macro '%s', expected 'on' or 'off'", state, macro_name)
+                self._log_sampled(
+                    logging.WARNING, f"macro_state:{macro_name}",
+                    "Invalid macro state '%s' for macro '%s', expected 'on' or 'off'", state, macro_name
+                )
         
         # FIX v1.2.8: Use QoS 0 for monitoring (subscribe), QoS 1 only for control (publish)
         # Don't add to global subscriptions as we track macros separately
@@ -498,31 +1288,214 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         
         # Only add to tracking if subscription succeeded
         if unsubscribe:
+            if macro_name not in self.data.macros.names:
+                # Removed from the list (or the replay ended) while subscribing
+                unsubscribe()
+                return
+            if (previous := self._macro_subscriptions.pop(macro_name, None)) is not None:
+                previous()
             self._macro_subscriptions[macro_name] = unsubscribe
             self._subscribed_macros.add(macro_name)  # Add AFTER successful subscription
-            _LOGGER.info("SUCCESS: Subscribed to macro trigger: %s", topic)
+            _LOGGER.debug("SUCCESS: Subscribed to macro trigger: %s", topic)
+            self._async_check_catalog_complete()
         else:
             _LOGGER.error("Failed to subscribe to macro trigger: %s", topic)
 
+    async def _async_publish(self, topic: str, payload: str, qos: int, retain: bool) -> None:
+        """Publish a message of the command queue."""
+        _LOGGER.debug("MQTT PUBLISH: topic='%s', payload='%s', qos=%d, retain=%s", topic, payload, qos, retain)
+        if (
+            (pending := self._pending_macro_commands.get(topic)) is not None
+            and pending.state == payload
+            and pending.published_at is None
+        ):
+            # The confirmation timeout runs from the publish, not from the queueing
+            pending.published_at = time.monotonic()
+            pending.cancel_timeout = async_call_later(
+                self.hass,
+                MACRO_CONFIRMATION_TIMEOUT,
+                partial(self._async_macro_command_timeout, topic, pending),
+            )
+        start = time.perf_counter()
+        failed = True
+        try:
+            await mqtt.async_publish(self.hass, topic, payload, qos=qos, retain=retain)
+            failed = False
+        finally:
+            self.metrics.record_publish(qos, time.perf_counter() - start, failed)
+
     async def async_trigger_macro(self, macro_name: str, action: str = "on") -> None:
         """Trigger a macro with ON or OFF action."""
         topic = f"{self.base_topic}/macro/{macro_name}/trigger"
         _LOGGER.debug("Triggering macro: %s with action: %s", macro_name, action)
         
+        # Tracked before publishing: the echo may arrive before the publish returns
+        pending = self._async_track_macro_command(topic, macro_name, action)
+        
         # Publish WITH retain - macro state is persistent (as per Haptique API doc)
-        _LOGGER.debug("MQTT PUBLISH (MACRO): topic='%s', payload='%s', qos=1, retain=True", topic, action)
-        await mqtt.async_publish(self.hass, topic, action, qos=1, retain=True)
+        # Macro triggers jump ahead of queued device commands
+        # Shielded: the future may be shared with coalesced callers, and a
+        # cancelled caller must not cancel (or stop tracking) the publish
+        published = self._command_queue.async_submit(
+            topic, action, qos=1, retain=True, priority=PRIORITY_MACRO
+        )
+        try:
+            await asyncio.shield(published)
+        except asyncio.CancelledError:
+            # Only the queue cancelling the message means it was never published
+            if published.cancelled() and self._pending_macro_commands.get(topic) is pending:
+                self._async_drop_macro_command(topic)
+            raise
+        except Exception:
+            # Publish failed: nothing to confirm
+            if self._pending_macro_commands.get(topic) is pending:
+                self._async_drop_macro_command(topic)
+            raise
         
-        # Update local state immediately (will be confirmed by MQTT callback)
-        self.data["macro_states"][macro_name] = action
-        self.async_set_updated_data(self.data)
+        # Update local state immediately (confirmed by the MQTT callback or
+        # rolled back on timeout), unless the remote already answered or a
+        # newer trigger superseded this one
+        if self._pending_macro_commands.get(topic) is pending:
+            self._async_set_macro_state(macro_name, action)
+
+    @callback
+    def _async_track_macro_command(
+        self, topic: str, macro_name: str, state: str
+    ) -> PendingMacroCommand:
+        """Start tracking a macro trigger until its state is echoed."""
+        if (superseded := self._pending_macro_commands.pop(topic, None)) is not None:
+            # Still unconfirmed: a rollback goes back to the last confirmed state
+            previous_state = superseded.previous_state
+            if superseded.cancel_timeout is not None:
+                superseded.cancel_timeout()
+        else:
+            previous_state = self.data.macro_states.get(macro_name)
+        pending = self._pending_macro_commands[topic] = PendingMacroCommand(
+            macro_name, state, previous_state, time.monotonic()
+        )
+        return pending
+
+    @callback
+    def _async_drop_macro_command(self, topic: str) -> PendingMacroCommand | None:
+        """Stop tracking a macro trigger."""
+        pending = self._pending_macro_commands.pop(topic, None)
+        if pending is not None and pending.cancel_timeout is not None:
+            pending.cancel_timeout()
+        return pending
+
+    @callback
+    def _async_confirm_macro_command(
+        self, topic: str, pending: PendingMacroCommand, state: str
+    ) -> None:
+        """Record the echo of a pending macro trigger."""
+        self._async_drop_macro_command(topic)
+        confirmations = self.metrics.macro_confirmations
+        if state != pending.state:
+            # The remote reports another state: it is stored as usual
+            confirmations.mismatched += 1
+            _LOGGER.debug(
+                "Macro '%s' echoed '%s' instead of '%s'", pending.macro_name, state, pending.state
+            )
+            return
+        confirmations.record(time.monotonic() - (pending.published_at or pending.submitted_at))
+
+    @callback
+    def _async_macro_command_timeout(
+        self, topic: str, pending: PendingMacroCommand, _now=None
+    ) -> None:
+        """Roll back the optimistic state of an unconfirmed macro trigger."""
+        if self._pending_macro_commands.get(topic) is not pending:
+            return  # Confirmed or superseded meanwhile
+        pending.cancel_timeout = None
+        self._async_drop_macro_command(topic)
+        confirmations = self.metrics.macro_confirmations
+        confirmations.timeouts += 1
+        macro_name = pending.macro_name
+        _LOGGER.warning(
+            "Macro '%s' %s not confirmed by the remote within %d s",
+            macro_name, pending.state, MACRO_CONFIRMATION_TIMEOUT
+        )
+        
+        # Only undo our own optimistic value (not a removal or a newer state)
+        if self.data.macro_states.get(macro_name) != pending.state:
+            return
+        if pending.previous_state == pending.state:
+            return
+        confirmations.rollbacks += 1
+        if pending.previous_state is None:
+            if self.data.remove_macro_state(macro_name):
+                self._async_notify(CHANNEL_MACRO_STATE, self.data.macros.id_by_name.get(macro_name))
+        else:
+            self._async_set_macro_state(macro_name, pending.previous_state)
 
     async def async_trigger_device_command(self, device_name: str, command_name: str) -> None:
         """Trigger a device command."""
         topic = f"{self.base_topic}/device/{device_name}/trigger"
         _LOGGER.debug("Triggering command %s for device %s", command_name, device_name)
-        _LOGGER.debug("MQTT PUBLISH (DEVICE): topic='%s', payload='%s', qos=1, retain=False", topic, command_name)
-        await mqtt.async_publish(self.hass, topic, command_name, qos=1, retain=False)
+        
+        # Paced per device (keyed by stable ID so gaps survive renames).
+        # Shielded: the future may be shared with coalesced callers.
+        await asyncio.shield(
+            self._command_queue.async_submit(
+                topic,
+                command_name,
+                qos=1,
+                retain=False,
+                priority=PRIORITY_DEVICE_COMMAND,
+                gap_key=self.data.devices.id_by_name.get(device_name, device_name),
+            )
+        )
+
+    @callback
+    def async_send_sequence(self, steps: list[tuple[str, str, float]]) -> asyncio.Task:
+        """Send a sequence of device commands in a single task.
+        
+        Args:
+            steps: (device name, command name, delay in seconds after the command)
+        
+        A sequence in progress for any device of the new sequence is cancelled.
+        """
+        device_names = {device_name for device_name, _, _ in steps}
+        for device_name in device_names:
+            if (task := self._sequence_tasks.get(device_name)) is not None and not task.done():
+                _LOGGER.debug("Cancelling command sequence in progress for %s", device_name)
+                task.cancel()
+        
+        task = self.hass.async_create_background_task(
+            self._async_run_sequence(steps, device_names),
+            f"{DOMAIN} {self.remote_id} command sequence",
+        )
+        for device_name in device_names:
+            self._sequence_tasks[device_name] = task
+        return task
+
+    async def _async_run_sequence(
+        self, steps: list[tuple[str, str, float]], device_names: set[str]
+    ) -> None:
+        """Run a command sequence with drift-free delays.
+        
+        Deadlines are computed from the start of the sequence on the monotonic
+        loop clock, so publish time does not accumulate into the delays.
+        """
+        loop = self.hass.loop
+        deadline = loop.time()
+        try:
+            for device_name, command_name, delay in steps:
+                await self.async_trigger_device_command(device_name, command_name)
+                deadline += delay
+                if (remaining := deadline - loop.time()) > 0:
+                    await asyncio.sleep(remaining)
+            _LOGGER.debug("Command sequence completed (%d steps)", len(steps))
+        except asyncio.CancelledError:
+            _LOGGER.debug("Command sequence cancelled")
+            raise
+        except Exception as err:  # noqa: BLE001 - background task, nobody awaits it
+            _LOGGER.error("✗ Command sequence failed: %s", err)
+        finally:
+            current = asyncio.current_task()
+            for device_name in device_names:
+                if self._sequence_tasks.get(device_name) is current:
+                    del self._sequence_tasks[device_name]
 
     async def async_control_led_light(self, state: str, duration: int = 5) -> None:
         """Control RGB ring light animation.
@@ -557,12 +1530,11 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             async def _auto_turn_off(_now=None):
                 """Automatically update local state after duration (RS90 handles actual off)."""
                 _LOGGER.debug("LED light duration expired, updating local state to OFF")
-                self.data["led_light_state"] = "off"
-                self.data["led_light_duration"] = 0
-                self.async_set_updated_data(self.data)
+                self.data.led_light_state = "off"
+                self.data.led_light_duration = 0
+                self._async_notify(CHANNEL_LED_LIGHT)
                 self._led_light_timer = None
             
-            from homeassistant.helpers.event import async_call_later
             self._led_light_timer = async_call_later(
                 self.hass,
                 duration,
@@ -573,9 +1545,9 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             _LOGGER.debug("Turning off LED light (local state only, no MQTT)")
         
         # Update local state
-        self.data["led_light_state"] = state
-        self.data["led_light_duration"] = duration if state == "on" else 0
-        self.async_set_updated_data(self.data)
+        self.data.led_light_state = state
+        self.data.led_light_duration = duration if state == "on" else 0
+        self._async_notify(CHANNEL_LED_LIGHT)
 
     async def async_shutdown(self) -> None:
         """Unsubscribe from all MQTT topics and cancel timers."""
@@ -593,16 +1565,47 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             self._led_light_timer = None
             _LOGGER.debug("Cancelled LED light timer")
         
+        # Cancel metrics sensors timer
+        if self._metrics_timer:
+            self._metrics_timer()
+            self._metrics_timer = None
+        
+        # Cancel macro confirmation timeouts
+        for topic in list(self._pending_macro_commands):
+            self._async_drop_macro_command(topic)
+        
+        # Cancel pending subscription jobs, command sequences and queued commands
+        self._scheduler.async_cancel()
+        for task in set(self._sequence_tasks.values()):
+            task.cancel()
+        self._sequence_tasks.clear()
+        self._command_queue.async_shutdown()
+        
+        # Cancel pending Last Key sensor write
+        if self._last_key_flush:
+            self._last_key_flush()
+            self._last_key_flush = None
+        
         # Unsubscribe from all global topics
         for unsubscribe in self._subscriptions:
             unsubscribe()
         self._subscriptions.clear()
         
+        # Unsubscribe from all device commands topics
+        for unsubscribe in self._device_subscriptions.values():
+            unsubscribe()
+        self._device_subscriptions.clear()
+        
         # Unsubscribe from all macro-specific topics
         for macro_name, unsubscribe in self._macro_subscriptions.items():
             unsubscribe()
             _LOGGER.debug("Unsubscribed from macro: %s", macro_name)
         self._macro_subscriptions.clear()
+        
+        # Write a delayed snapshot save now (this also cancels the Store timer):
+        # it must not run after the entry is unloaded or removed
+        if self._snapshot_save_pending:
+            await self._store.async_save(self._snapshot_data())
 
     def _start_battery_refresh_timer(self) -> None:
         """Start periodic battery level refresh timer.
@@ -612,22 +1615,7 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         """
         async def _refresh_battery(_now=None):
             """Request battery level update."""
-            battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
-            _LOGGER.debug("Periodic battery refresh - publishing to %s", battery_trigger_topic)
-            try:
-                await mqtt.async_publish(
-                    self.hass,
-                    battery_trigger_topic,
-                    "",
-                    qos=0,
-                    retain=False
-                )
-                _LOGGER.debug("SUCCESS: Battery refresh request sent")
-            except Exception as err:
-                _LOGGER.error("✗ Failed to send battery refresh request: %s", err)
-        
-        from homeassistant.helpers.event import async_track_time_interval
-        from datetime import timedelta
+            await self.async_request_battery()
         
         # Schedule periodic refresh - async_track_time_interval handles thread safety
         self._battery_refresh_timer = async_track_time_interval(
@@ -637,6 +1625,22 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         )
         _LOGGER.info("Started battery refresh timer (interval: %d seconds)", self._battery_refresh_interval)
 
+    async def async_request_battery(self) -> None:
+        """Request a battery level update (published by the remote on battery_level)."""
+        battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
+        _LOGGER.debug("Periodic battery refresh - publishing to %s", battery_trigger_topic)
+        try:
+            await mqtt.async_publish(
+                self.hass,
+                battery_trigger_topic,
+                "",
+                qos=0,
+                retain=False
+            )
+            _LOGGER.debug("SUCCESS: Battery refresh request sent")
+        except Exception as err:
+            _LOGGER.error("✗ Failed to send battery refresh request: %s", err)
+
     async def async_force_refresh_lists(self) -> None:
         """Force refresh of device and macro lists by re-processing current data.
         
@@ -666,61 +1670,118 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             _LOGGER.error("Failed to request battery update: %s", err)
         
         # Re-process current device list
-        if self.data.get("devices"):
+        if self.data.devices:
             _LOGGER.info("Re-processing device list to detect new devices...")
-            current_device_names = {device.get("name") for device in self.data["devices"] if device.get("name")}
-            new_devices = current_device_names - self._subscribed_devices
+            new_devices = self.data.devices.names - self._subscribed_devices
             
             if new_devices:
                 _LOGGER.info("NEW: Found %d new unsubscribed devices: %s", len(new_devices), new_devices)
+                self._async_mark_catalog_pending()
                 for device_name in new_devices:
                     _LOGGER.info("Subscribing to commands for: %s", device_name)
-                    await self._subscribe_device_details(device_name)
-                    self._subscribed_devices.add(device_name)
+                    self._async_schedule_device_details(device_name)
             else:
                 _LOGGER.info("No new devices to subscribe to")
         
         # Re-process current macro list
-        if self.data.get("macros"):
+        if self.data.macros:
             _LOGGER.info("Re-processing macro list to detect new macros...")
-            current_macro_names = {macro.get("name") for macro in self.data["macros"] if macro.get("name")}
-            new_macros = current_macro_names - self._subscribed_macros
+            new_macros = self.data.macros.names - self._subscribed_macros
             
             if new_macros:
                 _LOGGER.info("NEW: Found %d new unsubscribed macros: %s", len(new_macros), new_macros)
+                self._async_mark_catalog_pending()
                 for macro_name in new_macros:
                     _LOGGER.info("Subscribing to trigger for: %s", macro_name)
-                    await self._subscribe_macro_trigger(macro_name)
+                    self._async_schedule_macro_trigger(macro_name)
             else:
                 _LOGGER.info("No new macros to subscribe to")
         
+        # Wait for the scheduled subscriptions (bounded concurrency)
+        await self._scheduler.async_join()
+        
         # Log current state
-        _LOGGER.info("Current devices: %s", [d.get("name") for d in self.data.get("devices", [])])
+        _LOGGER.info("Current devices: %s", [device.name for device in self.data.devices])
         _LOGGER.info("Subscribed devices: %s", self._subscribed_devices)
-        _LOGGER.info("Current macros: %s", [m.get("name") for m in self.data.get("macros", [])])
+        _LOGGER.info("Current macros: %s", [macro.name for macro in self.data.macros])
         _LOGGER.info("Subscribed macros: %s", self._subscribed_macros)
 
     def get_diagnostics(self) -> dict:
         """Get diagnostic information."""
+        state = self.data.snapshot()
+        now = time.monotonic()
+        
         # Build detailed device_commands info
         device_commands_detail = {}
-        for device, commands in self.data.get("device_commands", {}).items():
+        for device, commands in state.device_commands.items():
             device_commands_detail[device] = {
                 "count": len(commands),
-                "command_ids": [cmd.get("id") for cmd in commands if cmd.get("id")],
-                "commands_full": commands[:5]  # Show first 5 commands as sample
+                "command_ids": [cmd.id for cmd in commands if cmd.id],
+                "commands_full": [cmd._asdict() for cmd in commands[:5]]  # Show first 5 commands as sample
             }
         
         return {
             "remote_id": self.remote_id,
-            "status": self.data.get("status"),
-            "devices_count": len(self.data.get("devices", [])),
-            "devices": self.data.get("devices", []),
-            "macros_count": len(self.data.get("macros", [])),
-            "macros": self.data.get("macros", []),
+            "status": state.status,
+            "devices_count": len(state.devices),
+            "devices": state.devices.as_list(),
+            "macros_count": len(state.macros),
+            "macros": state.macros.as_list(),
             "device_commands": device_commands_detail,
-            "device_commands_keys": list(self.data.get("device_commands", {}).keys()),
+            "device_commands_keys": list(state.device_commands),
+            "macro_states": dict(state.macro_states),
+            "active_macros": list(state.active_macros),
+            "subscription_mode": self.subscription_mode,
             "subscriptions_count": len(self._subscriptions),
+            "routes_count": len(self._routes),
+            "hub": (
+                async_get_hub(self.hass).as_dict()
+                if self.subscription_mode == SUBSCRIPTION_MODE_SHARED
+                else None
+            ),
             "subscribed_devices": list(self._subscribed_devices),
+            "suppressed_updates": self._suppressed_updates,
+            "payload_cache": {
+                "hits": self._fingerprint_hits,
+                "misses": self._fingerprint_misses,
+            },
+            "subscription_scheduler": self._scheduler.as_dict(),
+            "command_queue": self._command_queue.as_dict(),
+            "catalog_ready_seconds": self.catalog_ready_time,
+            "catalog_warm_start": self.catalog_warm_start,
+            "catalog_pending_seconds": (
+                time.monotonic() - self._catalog_pending_since
+                if self._catalog_pending_since is not None
+                else None
+            ),
+            "metrics": {
+                **self.metrics.as_dict(),
+                "subscriptions": {
+                    "global": len(self._subscriptions),
+                    "devices": len(self._device_subscriptions),
+                    "macros": len(self._macro_subscriptions),
+                    "routes": len(self._routes),
+                },
+            },
+            "pending_macro_commands": [
+                {
+                    "macro": pending.macro_name,
+                    "state": pending.state,
+                    "previous_state": pending.previous_state,
+                    "published": pending.published_at is not None,
+                    "broker_echoed": pending.broker_echo_at is not None,
+                    "age_seconds": round(now - pending.submitted_at, 3),
+                }
+                for pending in self._pending_macro_commands.values()
+            ],
+            "recent_messages": [
+                {
+                    "topic": topic,
+                    "size": size,
+                    "handler_ms": round(duration * 1000, 3),
+                    "received": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                }
+                for topic, size, duration, timestamp in self._recent_messages
+            ],
         }
 
@@ -0,0 +1,53 @@
+"""Base entity for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import HaptiqueRS90Coordinator
+
+_T = TypeVar("_T")
+
+
+class HaptiqueRS90Entity(CoordinatorEntity):
+    """Coordinator entity refreshed only by the data channels it renders.
+
+    The coordinator no longer broadcasts every MQTT message to all entities.
+    Each entity declares the (channel, key) pairs it depends on and only
+    writes its state when one of them changes.
+    """
+
+    coordinator: HaptiqueRS90Coordinator
+
+    def __init__(self, coordinator: HaptiqueRS90Coordinator, context: Any = None) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator, context)
+        # Memoized derived values: name -> (data versions, value)
+        self._memo: dict[str, tuple[tuple[int, ...], Any]] = {}
+
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the (channel, key) pairs this entity listens to."""
+        return []
+
+    def _memoized(self, name: str, compute: Callable[[], _T]) -> _T:
+        """Return a derived value, recomputed only when a channel it renders changed."""
+        version = tuple(
+            self.coordinator.data_version(channel, key) for channel, key in self._channels()
+        )
+        if (cached := self._memo.get(name)) is not None and cached[0] == version:
+            return cached[1]
+        value = compute()
+        self._memo[name] = (version, value)
+        return value
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator channels of this entity."""
+        await super().async_added_to_hass()
+        for channel, key in self._channels():
+            self.async_on_remove(
+                self.coordinator.async_add_channel_listener(
+                    channel, self._handle_coordinator_update, key
+                )
+            )
@@ -0,0 +1,211 @@
+"""Domain-level MQTT hub for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import (
+    BATTERY_REFRESH_INTERVAL,
+    CONF_REMOTE_ID,
+    DATA_HUB,
+    DOMAIN,
+    HUB_RESYNC_TIME,
+    TOPIC_BASE,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import HaptiqueRS90Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> HaptiqueRS90Hub:
+    """Return the hub shared by every remote, creating it if needed."""
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = HaptiqueRS90Hub(hass)
+    return hub
+
+
+class HaptiqueRS90Hub:
+    """Single Haptique/+/# subscription and battery timer for every remote.
+
+    Used by the coordinators in shared subscription mode: messages are
+    dispatched to the routing table of the remote named in the topic, so the
+    broker subscription count and the per-message cost do not grow with the
+    number of remotes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._coordinators: dict[str, HaptiqueRS90Coordinator] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        # Serializes subscriptions: concurrent setups must not subscribe twice
+        self._subscribe_lock = asyncio.Lock()
+        # Temporary Haptique/<remote_id>/# subscriptions (unsubscribe, timer)
+        self._resyncs: dict[str, tuple[CALLBACK_TYPE, CALLBACK_TYPE]] = {}
+        self._battery_timer: CALLBACK_TYPE | None = None
+        # Remotes with an enabled config entry when the subscription was made:
+        # only their retained messages are kept until they register
+        self._expected: frozenset[str] = frozenset()
+        # Retained messages of expected remotes not registered yet (replayed on registration)
+        self._pending_retained: dict[str, dict[str, Any]] = {}
+        # Remotes registered since the subscription was made: their retained
+        # messages were consumed, a new registration needs a resync
+        self._registered: set[str] = set()
+        self.messages = 0
+        self.unrouted = 0
+        self.resyncs = 0
+
+    async def async_register(self, coordinator: HaptiqueRS90Coordinator) -> CALLBACK_TYPE:
+        """Route the messages of a remote to its coordinator.
+
+        Returns:
+            Function unregistering the coordinator
+        """
+        remote_id = coordinator.remote_id
+
+        async with self._subscribe_lock:
+            self._coordinators[remote_id] = coordinator
+            if self._unsubscribe is None:
+                await self._async_subscribe()
+            elif remote_id in self._registered or remote_id not in self._expected:
+                # Reloaded or newly configured remote: its retained messages
+                # were consumed or not kept, and the broker only redelivers
+                # them on subscription
+                self._pending_retained.pop(remote_id, None)
+                self._expected |= {remote_id}
+                await self._async_resync(remote_id)
+            else:
+                for msg in self._pending_retained.pop(remote_id, {}).values():
+                    coordinator._route_message(msg)
+            self._registered.add(remote_id)
+
+        if self._battery_timer is None:
+            self._battery_timer = async_track_time_interval(
+                self.hass,
+                self._async_refresh_batteries,
+                timedelta(seconds=BATTERY_REFRESH_INTERVAL),
+            )
+
+        @callback
+        def unregister() -> None:
+            """Stop routing the messages of the remote."""
+            if self._coordinators.get(remote_id) is coordinator:
+                del self._coordinators[remote_id]
+                self._async_end_resync(remote_id)
+            if not self._coordinators:
+                self._async_stop()
+
+        return unregister
+
+    async def _async_subscribe(self) -> None:
+        """Subscribe to the topics of every remote (raw payloads)."""
+        topic = f"{TOPIC_BASE}/+/#"
+        self._expected = frozenset(
+            entry.data[CONF_REMOTE_ID]
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.disabled_by is None
+        )
+        _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=0", topic)
+        self._unsubscribe = await mqtt.async_subscribe(
+            self.hass, topic, self._async_route_message, qos=0, encoding=None
+        )
+
+    async def _async_resync(self, remote_id: str) -> None:
+        """Get the retained messages of one remote back from the broker.
+
+        A Haptique/<remote_id>/# subscription is added for HUB_RESYNC_TIME:
+        the shared subscription stays active, so the other remotes keep
+        receiving their live messages and their retained messages are not
+        sent again.
+        """
+        self._async_end_resync(remote_id)
+        topic = f"{TOPIC_BASE}/{remote_id}/#"
+
+        @callback
+        def route_retained(msg) -> None:
+            """Route a retained message (live ones come from the shared subscription)."""
+            if msg.retain and (coordinator := self._coordinators.get(remote_id)) is not None:
+                coordinator._route_message(msg)
+
+        _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=0 (resync)", topic)
+        unsubscribe = await mqtt.async_subscribe(
+            self.hass, topic, route_retained, qos=0, encoding=None
+        )
+        cancel_timer = async_call_later(
+            self.hass, HUB_RESYNC_TIME, partial(self._async_resync_done, remote_id)
+        )
+        self._resyncs[remote_id] = (unsubscribe, cancel_timer)
+        self.resyncs += 1
+
+    @callback
+    def _async_resync_done(self, remote_id: str, _now=None) -> None:
+        """Drop the resync subscription of a remote."""
+        if (resync := self._resyncs.pop(remote_id, None)) is not None:
+            resync[0]()
+
+    @callback
+    def _async_end_resync(self, remote_id: str) -> None:
+        """Drop the resync subscription of a remote and its timer."""
+        if (resync := self._resyncs.pop(remote_id, None)) is not None:
+            unsubscribe, cancel_timer = resync
+            cancel_timer()
+            unsubscribe()
+
+    @callback
+    def _async_route_message(self, msg) -> None:
+        """Dispatch a message to the coordinator of its remote."""
+        self.messages += 1
+        remote_id = msg.topic.split("/", 2)[1]
+        if (coordinator := self._coordinators.get(remote_id)) is None:
+            self.unrouted += 1
+            # Retained messages of remotes without a config entry are dropped
+            if msg.retain and remote_id in self._expected and remote_id not in self._registered:
+                self._pending_retained.setdefault(remote_id, {})[msg.topic] = msg
+            return
+        coordinator._route_message(msg)
+
+    async def _async_refresh_batteries(self, _now=None) -> None:
+        """Request the battery level of every remote."""
+        await asyncio.gather(
+            *(
+                coordinator.async_request_battery()
+                for coordinator in list(self._coordinators.values())
+            )
+        )
+
+    @callback
+    def _async_stop(self) -> None:
+        """Unsubscribe and stop the battery timer (no remote left)."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._battery_timer is not None:
+            self._battery_timer()
+            self._battery_timer = None
+        for remote_id in list(self._resyncs):
+            self._async_end_resync(remote_id)
+        self._pending_retained.clear()
+        self._registered.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return hub statistics for diagnostics."""
+        return {
+            "remotes": len(self._coordinators),
+            "subscribed": self._unsubscribe is not None,
+            "messages": self.messages,
+            "unrouted": self.unrouted,
+            "expected_remotes": len(self._expected),
+            "pending_retained_remotes": len(self._pending_retained),
+            "resyncs": self.resyncs,
+            "active_resyncs": len(self._resyncs),
+        }
@@ -0,0 +1,235 @@
+"""Performance metrics for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+import math
+from typing import Any
+
+# Latency histogram bucket upper bounds in milliseconds (plus one overflow bucket)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+
+def _empty_buckets() -> list[int]:
+    """Return zeroed bucket counters."""
+    return [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (recording is a bisect and three adds)."""
+
+    buckets: list[int] = field(default_factory=_empty_buckets)
+    count: int = 0
+    total: float = 0.0  # Seconds
+    max: float = 0.0  # Seconds
+
+    def record(self, seconds: float) -> None:
+        """Record a duration."""
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def avg_ms(self) -> float | None:
+        """Return the average duration in milliseconds."""
+        return round(self.total / self.count * 1000, 3) if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        buckets = {
+            f"le_{bound}ms": count
+            for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)
+        }
+        buckets[f"gt_{LATENCY_BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "avg_ms": self.avg_ms,
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": buckets,
+        }
+
+
+@dataclass(slots=True)
+class TopicMetrics:
+    """Message metrics of one MQTT topic."""
+
+    messages: int = 0
+    bytes: int = 0
+    over_budget: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the topic metrics for diagnostics."""
+        return {
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "over_budget": self.over_budget,
+            "handler_latency": self.latency.as_dict(),
+        }
+
+
+@dataclass(slots=True)
+class FanoutMetrics:
+    """Listener fan-out of one coordinator channel."""
+
+    notifications: int = 0
+    listeners: int = 0
+    max_listeners: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fan-out metrics for diagnostics."""
+        return {
+            "notifications": self.notifications,
+            "listeners_total": self.listeners,
+            "listeners_avg": (
+                round(self.listeners / self.notifications, 2) if self.notifications else None
+            ),
+            "listeners_max": self.max_listeners,
+        }
+
+
+@dataclass(slots=True)
+class MacroConfirmationMetrics:
+    """Round trip of macro triggers: publish to echo by the remote on the trigger topic.
+
+    The echo of our own publish by the broker is measured separately.
+    """
+
+    samples: int
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    broker_echo: LatencyHistogram = field(default_factory=LatencyHistogram)
+    recent: deque[float] = field(init=False)  # Seconds, last samples for the percentiles
+    confirmed: int = 0
+    # Echo with another state than the one requested (the remote state wins)
+    mismatched: int = 0
+    timeouts: int = 0
+    rollbacks: int = 0
+
+    def __post_init__(self) -> None:
+        """Create the bounded sample buffer."""
+        self.recent = deque(maxlen=self.samples)
+
+    def record(self, seconds: float) -> None:
+        """Record a confirmed trigger."""
+        self.confirmed += 1
+        self.latency.record(seconds)
+        self.recent.append(seconds)
+
+    def percentiles(self) -> dict[str, float | None]:
+        """Return the p50/p90/p99 echo latency of the recent samples (nearest rank, ms)."""
+        values = sorted(self.recent)
+        return {
+            f"p{percentile}_ms": (
+                round(values[math.ceil(percentile / 100 * len(values)) - 1] * 1000, 3)
+                if values
+                else None
+            )
+            for percentile in (50, 90, 99)
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the confirmation metrics for diagnostics."""
+        return {
+            "confirmed": self.confirmed,
+            "mismatched": self.mismatched,
+            "timeouts": self.timeouts,
+            "rollbacks": self.rollbacks,
+            "latency": self.latency.as_dict(),
+            "broker_echo_latency": self.broker_echo.as_dict(),
+            "recent_samples": len(self.recent),
+            **self.percentiles(),
+        }
+
+
+class MetricsRegistry:
+    """In-memory performance metrics of one remote.
+
+    Records handler latency and size per topic, listener fan-out per
+    channel, publish latency per QoS, subscription counts and the round
+    trip of macro triggers. Handlers slower than the latency budget are
+    counted as over budget.
+    """
+
+    def __init__(self, latency_budget: float, macro_latency_samples: int) -> None:
+        """Initialize the registry (latency budget in seconds)."""
+        self.latency_budget = latency_budget
+        self.messages = 0
+        self.over_budget = 0
+        self.handler_latency = LatencyHistogram()
+        self.topics: dict[str, TopicMetrics] = {}
+        self.fanout: dict[str, FanoutMetrics] = {}
+        self.publish_latency: dict[int, LatencyHistogram] = {}
+        self.publish_failures = 0
+        self.subscribes = 0
+        self.macro_confirmations = MacroConfirmationMetrics(macro_latency_samples)
+
+    def record_message(self, topic: str, size: int, seconds: float) -> bool:
+        """Record a handled message.
+
+        Returns:
+            True if the handler exceeded the latency budget
+        """
+        if (metrics := self.topics.get(topic)) is None:
+            metrics = self.topics[topic] = TopicMetrics()
+        metrics.messages += 1
+        metrics.bytes += size
+        metrics.latency.record(seconds)
+        self.messages += 1
+        self.handler_latency.record(seconds)
+        if seconds > self.latency_budget:
+            metrics.over_budget += 1
+            self.over_budget += 1
+            return True
+        return False
+
+    def record_fanout(self, channel: str, listeners: int) -> None:
+        """Record the number of listeners called by a channel notification."""
+        if (metrics := self.fanout.get(channel)) is None:
+            metrics = self.fanout[channel] = FanoutMetrics()
+        metrics.notifications += 1
+        metrics.listeners += listeners
+        if listeners > metrics.max_listeners:
+            metrics.max_listeners = listeners
+
+    def record_publish(self, qos: int, seconds: float, failed: bool = False) -> None:
+        """Record the duration of a publish."""
+        if (histogram := self.publish_latency.get(qos)) is None:
+            histogram = self.publish_latency[qos] = LatencyHistogram()
+        histogram.record(seconds)
+        if failed:
+            self.publish_failures += 1
+
+    def record_subscribe(self) -> None:
+        """Record a subscription (broker subscription or wildcard route)."""
+        self.subscribes += 1
+
+    @property
+    def publish_avg_ms(self) -> float | None:
+        """Return the average publish latency over every QoS, in milliseconds."""
+        count = sum(histogram.count for histogram in self.publish_latency.values())
+        if not count:
+            return None
+        total = sum(histogram.total for histogram in self.publish_latency.values())
+        return round(total / count * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric for diagnostics."""
+        return {
+            "latency_budget_ms": round(self.latency_budget * 1000, 3),
+            "messages": self.messages,
+            "over_budget": self.over_budget,
+            "handler_latency": self.handler_latency.as_dict(),
+            "topics": {topic: metrics.as_dict() for topic, metrics in self.topics.items()},
+            "fanout": {channel: metrics.as_dict() for channel, metrics in self.fanout.items()},
+            "publish_latency": {
+                f"qos_{qos}": histogram.as_dict()
+                for qos, histogram in sorted(self.publish_latency.items())
+            },
+            "publish_failures": self.publish_failures,
+            "subscribes": self.subscribes,
+            "macro_confirmations": self.macro_confirmations.as_dict(),
+        }
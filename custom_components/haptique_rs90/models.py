@@ -0,0 +1,276 @@
+"""Data models for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+import sys
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+from .const import STATE_OFFLINE
+
+
+class RS90Command(NamedTuple):
+    """A learned command of an RS90 device.
+
+    Stored as a plain tuple: remotes with thousands of commands would
+    otherwise pay a dict per command.
+    """
+
+    id: str | None
+    name: str | None
+
+    @classmethod
+    def from_payload(cls, command: dict[str, Any]) -> RS90Command:
+        """Build a command from an MQTT payload item (handles "id", "Id", "ID")."""
+        name = command.get("name")
+        return cls(
+            command.get("id") or command.get("Id") or command.get("ID"),
+            # Names repeat across devices ("POWER", "VOL+"...): share one string
+            sys.intern(name) if isinstance(name, str) else name,
+        )
+
+
+def commands_from_payload(commands: list[dict[str, Any]]) -> tuple[RS90Command, ...]:
+    """Build a compact command catalog from a decoded /commands payload."""
+    return tuple(map(RS90Command.from_payload, commands))
+
+
+class MQTTMessage(NamedTuple):
+    """A raw MQTT message (recorded traffic, injected into the coordinator)."""
+
+    topic: str
+    payload: bytes
+    qos: int
+    retain: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogItem:
+    """A device or macro of the RS90 catalog."""
+
+    id: str | None
+    name: str | None
+
+    @classmethod
+    def from_payload(cls, item: dict[str, Any]) -> CatalogItem:
+        """Build an item from an MQTT or snapshot list item (handles "id", "Id")."""
+        return cls(item.get("id") or item.get("Id"), item.get("name"))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the item as stored in the snapshot."""
+        return {"id": self.id, "name": self.name}
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogList:
+    """Immutable device or macro list with its lookup views.
+
+    The views are built once when a list is received, so readers never
+    rebuild or sort them. Lists are replaced, never mutated.
+    """
+
+    items: tuple[CatalogItem, ...]
+    # Names of the items (with or without an ID)
+    names: frozenset[str]
+    id_by_name: Mapping[str, str]
+    name_by_id: Mapping[str, str]
+    # name -> ID ordered by case-insensitive name
+    sorted_id_by_name: Mapping[str, str]
+
+    @classmethod
+    def from_items(cls, items: Iterable[CatalogItem]) -> CatalogList:
+        """Build a list and its views."""
+        items = tuple(items)
+        id_by_name = {item.name: item.id for item in items if item.id and item.name}
+        return cls(
+            items=items,
+            names=frozenset(item.name for item in items if item.name),
+            id_by_name=MappingProxyType(id_by_name),
+            name_by_id=MappingProxyType({item_id: name for name, item_id in id_by_name.items()}),
+            sorted_id_by_name=MappingProxyType(
+                {name: id_by_name[name] for name in sorted(id_by_name, key=str.lower)}
+            ),
+        )
+
+    @classmethod
+    def from_payload(cls, items: list[dict[str, Any]]) -> CatalogList:
+        """Build a list from a decoded /list payload or snapshot."""
+        return cls.from_items(map(CatalogItem.from_payload, items))
+
+    def diff(self, old: CatalogList) -> CatalogDelta:
+        """Return the structural change from an older list (by stable ID).
+
+        Items without an ID or a name have no entity and are ignored.
+        """
+        old_names = old.name_by_id
+        new_names = self.name_by_id
+        return CatalogDelta(
+            added=tuple(
+                item for item in self.items
+                if item.id in new_names and item.id not in old_names
+            ),
+            removed=tuple(
+                item for item in old.items
+                if item.id in old_names and item.id not in new_names
+            ),
+            renamed=tuple(
+                (CatalogItem(item_id, old_names[item_id]), CatalogItem(item_id, name))
+                for item_id, name in new_names.items()
+                if item_id in old_names and old_names[item_id] != name
+            ),
+        )
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the list as stored in the snapshot."""
+        return [item.as_dict() for item in self.items]
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[CatalogItem]:
+        """Iterate over the items in list order."""
+        return iter(self.items)
+
+
+EMPTY_CATALOG_LIST = CatalogList.from_items(())
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogDelta:
+    """Structural change of a device or macro list, computed once per list change."""
+
+    added: tuple[CatalogItem, ...] = ()
+    removed: tuple[CatalogItem, ...] = ()
+    # (old item, new item) pairs sharing the same ID
+    renamed: tuple[tuple[CatalogItem, CatalogItem], ...] = ()
+
+    def __bool__(self) -> bool:
+        """Return True if entities have to be added, removed or renamed."""
+        return bool(self.added or self.removed or self.renamed)
+
+
+@dataclass(frozen=True, slots=True)
+class RemoteSnapshot:
+    """Immutable view of the remote state at one point in time."""
+
+    status: str
+    battery_level: int | None
+    last_key: str | None
+    running_macro: str | None
+    test_status: str | None
+    led_light_state: str
+    led_light_duration: int
+    devices: CatalogList
+    macros: CatalogList
+    device_commands: Mapping[str, tuple[RS90Command, ...]]
+    macro_states: Mapping[str, str]
+    active_macros: tuple[str, ...]
+
+
+@dataclass(slots=True)
+class RemoteState:
+    """State of a remote, owned and mutated by its coordinator only.
+
+    Macro states go through set_macro_state/remove_macro_state so the set of
+    active macros stays up to date without scanning every macro.
+    """
+
+    status: str = STATE_OFFLINE
+    battery_level: int | None = None
+    last_key: str | None = None
+    running_macro: str | None = None
+    test_status: str | None = None
+    led_light_state: str = "off"  # RGB ring light state
+    led_light_duration: int = 5  # Default duration in seconds
+    devices: CatalogList = EMPTY_CATALOG_LIST
+    macros: CatalogList = EMPTY_CATALOG_LIST
+    # Device name -> commands
+    device_commands: dict[str, tuple[RS90Command, ...]] = field(default_factory=dict)
+    # Macro name -> "on"/"off", from MQTT only
+    macro_states: dict[str, str] = field(default_factory=dict)
+    # Names of the macros "on", in the order they were turned on (ordered set)
+    _active_macros: dict[str, None] = field(default_factory=dict, init=False, repr=False)
+
+    @property
+    def active_macros(self) -> tuple[str, ...]:
+        """Return the names of the macros currently on."""
+        return tuple(self._active_macros)
+
+    def set_macro_state(self, macro_name: str, state: str) -> bool:
+        """Store the state of a macro.
+
+        Returns:
+            True if the state changed
+        """
+        if self.macro_states.get(macro_name) == state:
+            return False
+        self.macro_states[macro_name] = state
+        if state == "on":
+            self._active_macros[macro_name] = None
+        else:
+            self._active_macros.pop(macro_name, None)
+        return True
+
+    def remove_macro_state(self, macro_name: str) -> bool:
+        """Forget the state of a removed macro.
+
+        Returns:
+            True if the macro had a state
+        """
+        self._active_macros.pop(macro_name, None)
+        return self.macro_states.pop(macro_name, None) is not None
+
+    def copy(self) -> RemoteState:
+        """Return a mutable copy (catalog lists are shared, not copied)."""
+        state = RemoteState(
+            status=self.status,
+            battery_level=self.battery_level,
+            last_key=self.last_key,
+            running_macro=self.running_macro,
+            test_status=self.test_status,
+            led_light_state=self.led_light_state,
+            led_light_duration=self.led_light_duration,
+            devices=self.devices,
+            macros=self.macros,
+            device_commands=dict(self.device_commands),
+            macro_states=dict(self.macro_states),
+        )
+        state._active_macros = dict(self._active_macros)
+        return state
+
+    def snapshot(self) -> RemoteSnapshot:
+        """Return an immutable copy (catalog lists are shared, not copied)."""
+        return RemoteSnapshot(
+            status=self.status,
+            battery_level=self.battery_level,
+            last_key=self.last_key,
+            running_macro=self.running_macro,
+            test_status=self.test_status,
+            led_light_state=self.led_light_state,
+            led_light_duration=self.led_light_duration,
+            devices=self.devices,
+            macros=self.macros,
+            device_commands=MappingProxyType(dict(self.device_commands)),
+            macro_states=MappingProxyType(dict(self.macro_states)),
+            active_macros=self.active_macros,
+        )
+
+
+@dataclass(slots=True)
+class PendingMacroCommand:
+    """A macro trigger waiting for the remote to echo its state on the trigger topic.
+
+    The broker sends our own publish back first (retained trigger topic):
+    that echo only proves delivery to the broker and does not confirm it.
+    """
+
+    macro_name: str
+    state: str
+    # Last state before the first unconfirmed trigger (restored on timeout)
+    previous_state: str | None
+    submitted_at: float  # Monotonic
+    published_at: float | None = None  # Monotonic, set when the queue publishes it
+    broker_echo_at: float | None = None  # Monotonic, set when our own publish comes back
+    cancel_timeout: Callable[[], None] | None = None
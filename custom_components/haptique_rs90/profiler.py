@@ -0,0 +1,113 @@
+"""On-demand profiler for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import tracemalloc
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+INTEGRATION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+
+# Entry points whose totals are reported separately: MQTT handlers,
+# message dispatch, entity reconcilers and service handlers
+_HANDLER_RE = re.compile(
+    r"^(_?handle_|_async_handle_message$|_route_message$|_dispatch_route$|message_received$|manage_)"
+)
+
+
+async def async_profile(hass: HomeAssistant, name: str, duration: float) -> str:
+    """Profile the event loop and trace allocations for duration seconds.
+
+    cProfile and tracemalloc record everything running meanwhile; the report
+    only keeps the functions and allocation sites of this integration.
+
+    Returns:
+        Path of the written report
+    """
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        profiler.enable()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        # Leave tracing alone if someone else (e.g. the profiler integration) started it
+        if started_tracing:
+            tracemalloc.stop()
+
+    path = hass.config.path(
+        f"{DOMAIN}_profile_{name}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    )
+    # Formatting the statistics is CPU bound, keep it off the event loop
+    await hass.async_add_executor_job(_write_report, path, profiler, snapshot, duration)
+    return path
+
+
+def _write_report(
+    path: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    duration: float,
+) -> None:
+    """Write the profiling report (runs in the executor)."""
+    stream = io.StringIO()
+    stream.write(f"Haptique RS90 profile - {duration:g} s - {dt_util.now().isoformat()}\n\n")
+
+    # Per-handler totals
+    stats = pstats.Stats(profiler)
+    handlers = sorted(
+        (
+            (func_name, ncalls, tottime, cumtime, f"{os.path.basename(filename)}:{line}")
+            for (filename, line, func_name), (_, ncalls, tottime, cumtime, _) in stats.stats.items()
+            if filename.startswith(INTEGRATION_DIR) and _HANDLER_RE.match(func_name)
+        ),
+        key=lambda handler: handler[3],
+        reverse=True,
+    )
+    stream.write("=== Handler totals (sorted by cumulative time) ===\n")
+    stream.write(f"{'handler':<40} {'calls':>8} {'own ms':>10} {'cum ms':>10}  location\n")
+    for func_name, ncalls, tottime, cumtime, location in handlers:
+        stream.write(
+            f"{func_name:<40} {ncalls:>8} {tottime * 1000:>10.2f} {cumtime * 1000:>10.2f}  {location}\n"
+        )
+    if not handlers:
+        stream.write("No handler called during the profile\n")
+
+    # Top functions of the integration
+    stream.write(f"\n=== Top {TOP_FUNCTIONS} integration functions (cumulative) ===\n")
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(
+        re.escape(INTEGRATION_DIR), TOP_FUNCTIONS
+    )
+
+    # Allocation sites still alive at the end of the profile
+    stream.write(f"\n=== Top {TOP_ALLOCATIONS} integration allocation sites (live memory) ===\n")
+    statistics = snapshot.filter_traces(
+        [tracemalloc.Filter(True, os.path.join(INTEGRATION_DIR, "*"))]
+    ).statistics("lineno")
+    for statistic in statistics[:TOP_ALLOCATIONS]:
+        stream.write(f"{statistic}\n")
+    if not statistics:
+        stream.write("No live allocation from the integration\n")
+
+    with open(path, "w", encoding="utf-8") as report:
+        report.write(stream.getvalue())
+    _LOGGER.debug("Profile report written to %s", path)
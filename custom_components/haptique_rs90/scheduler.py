@@ -0,0 +1,105 @@
+"""Subscription scheduler for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SubscriptionScheduler:
+    """Run subscribe/detail-request jobs with bounded concurrency.
+
+    Jobs are keyed (e.g. "device:TV"): scheduling a key that is already
+    in flight returns the existing task instead of starting a second one.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, concurrency: int) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._name = name
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._running = 0
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.set_concurrency(concurrency)
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """Set the maximum number of jobs running at once (applies to new jobs)."""
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of scheduled jobs not finished yet."""
+        return len(self._tasks)
+
+    @callback
+    def async_schedule(
+        self, key: str, job: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        """Schedule a job unless a job with the same key is in flight."""
+        if (task := self._tasks.get(key)) is not None:
+            self.deduplicated += 1
+            _LOGGER.debug("Job %s already in flight - not scheduled again", key)
+            return task
+
+        task = self._hass.async_create_background_task(
+            self._async_run(key, job, self._semaphore),
+            f"{self._name} {key}",
+        )
+        self._tasks[key] = task
+        return task
+
+    async def _async_run(
+        self,
+        key: str,
+        job: Callable[[], Awaitable[Any]],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Run a job once a concurrency slot is free."""
+        try:
+            async with semaphore:
+                self._running += 1
+                try:
+                    await job()
+                finally:
+                    self._running -= 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 - a failed job must not stop the others
+            self.failed += 1
+            _LOGGER.exception("Subscription job %s failed", key)
+        else:
+            self.completed += 1
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    async def async_join(self) -> None:
+        """Wait until every scheduled job (including ones added meanwhile) is done."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel every pending job."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return scheduler statistics for diagnostics."""
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "running": self._running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+        }
@@ -10,15 +10,26 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import PERCENTAGE, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, CONF_REMOTE_ID
+from .const import (
+    DOMAIN,
+    CONF_REMOTE_ID,
+    CHANNEL_BATTERY,
+    CHANNEL_KEYS,
+    CHANNEL_CATALOG,
+    CHANNEL_MACRO_STATE,
+    CHANNEL_COMMANDS,
+    CHANNEL_METRICS,
+    CATALOG_DEVICES,
+)
 from .coordinator import HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
+from .models import CatalogDelta
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,22 +50,17 @@ async def async_setup_entry(
         HaptiqueRS90BatterySensor(coordinator, entry),
         HaptiqueRS90LastKeySensor(coordinator, entry),
         HaptiqueRS90RunningMacroSensor(coordinator, entry),
+        # Performance metrics (disabled by default)
+        HaptiqueRS90MessagesSensor(coordinator, entry),
+        HaptiqueRS90HandlerLatencySensor(coordinator, entry),
+        HaptiqueRS90PublishLatencySensor(coordinator, entry),
     ]
     
     # Track device command sensors by device ID
     device_sensors: dict[str, HaptiqueRS90DeviceCommandsSensor] = {}
     
     # Create device command sensors
-    devices = coordinator.data.get("devices", [])
-    device_id_to_name = {d.get("id"): d.get("name") for d in devices if d.get("id") and d.get("name")}
-    sorted_devices = sorted(devices, key=lambda d: d.get("name", "").lower())
-    
-    for device in sorted_devices:
-        device_id = device.get("id")
-        device_name = device.get("name")
-        if not device_id or not device_name:
-            continue
-        
+    for device_name, device_id in coordinator.data.devices.sorted_id_by_name.items():
         sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, entry, device_name)
         device_sensors[device_id] = sensor
         entities.append(sensor)
@@ -63,70 +69,47 @@ async def async_setup_entry(
     async_add_entities(entities)
     
     @callback
-    def manage_device_sensors() -> None:
-        """Add new device sensors and remove obsolete ones."""
+    def manage_device_sensors(delta: CatalogDelta) -> None:
+        """Add, remove and rename the sensors of the changed devices only."""
         _LOGGER.debug("=== SENSOR: Entity update triggered ===")
         entity_registry = er.async_get(hass)
+        added = list(delta.added)
         
-        # Build mapping of device IDs to names from current MQTT data
-        current_devices = coordinator.data.get("devices", [])
-        device_id_to_name = {device.get("id"): device.get("name") 
-                            for device in current_devices 
-                            if device.get("id") and device.get("name")}
-        
-        current_device_ids = set(device_id_to_name.keys())
-        existing_device_ids = set(device_sensors.keys())
-        
-        _LOGGER.debug("Current device IDs from MQTT: %s", current_device_ids)
-        _LOGGER.debug("Existing device IDs in HA: %s", existing_device_ids)
-        
-        # Check for renamed devices (same ID, different name)
-        for device_id in current_device_ids & existing_device_ids:
-            new_name = device_id_to_name[device_id]
-            sensor = device_sensors.get(device_id)
-            if sensor and sensor._device_name != new_name:
-                old_name = sensor._device_name
-                _LOGGER.info("RENAME: Device renamed: '%s' → '%s' (id: %s)", 
-                            old_name, new_name, device_id)
-                # Update sensor's internal name
-                sensor._device_name = new_name
-                # Update friendly name in entity registry
-                entity_reg = er.async_get(hass)
-                if entity_entry := entity_reg.async_get(sensor.entity_id):
-                    entity_reg.async_update_entity(
-                        sensor.entity_id,
-                        name=f"Commands - {new_name}"
-                    )
-                # Force immediate state update
+        # Renamed devices (same ID, different name)
+        for old_device, device in delta.renamed:
+            sensor = device_sensors.get(device.id)
+            if sensor is None:
+                added.append(device)  # No sensor yet, create it under the new name
+                continue
+            _LOGGER.info("RENAME: Device renamed: '%s' → '%s' (id: %s)", 
+                        old_device.name, device.name, device.id)
+            # Update sensor's internal name
+            sensor._device_name = device.name
+            if sensor.entity_id and entity_registry.async_get(sensor.entity_id):
+                # Keep the registry name in sync; the registry update writes the state
+                entity_registry.async_update_entity(
+                    sensor.entity_id,
+                    name=f"Commands - {device.name}"
+                )
+            elif sensor.hass is not None:
                 sensor.async_write_ha_state()
-                sensor.async_schedule_update_ha_state(force_refresh=True)
         
-        # Find devices to add
-        devices_to_add = current_device_ids - existing_device_ids
+        # New devices
         new_entities = []
-        
-        if devices_to_add:
-            _LOGGER.info("Devices to add (by ID): %s", devices_to_add)
-        
-        for device in coordinator.data.get("devices", []):
-            device_id = device.get("id")
-            device_name = device.get("name")
-            if device_id in devices_to_add and device_name:
-                sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, entry, device_name)
-                device_sensors[device_id] = sensor  # Use device_id as key, not name
-                new_entities.append(sensor)
-                _LOGGER.info("SUCCESS: Adding commands sensor for new device: %s (id: %s)", device_name, device_id)
+        for device in added:
+            if device.id in device_sensors:
+                continue
+            sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, entry, device.name)
+            device_sensors[device.id] = sensor  # Use device_id as key, not name
+            new_entities.append(sensor)
+            _LOGGER.info("SUCCESS: Adding commands sensor for new device: %s (id: %s)", device.name, device.id)
         
         if new_entities:
             async_add_entities(new_entities)
         
-        # Find devices to remove
-        devices_to_remove = existing_device_ids - current_device_ids
-        
-        if devices_to_remove:
-            _LOGGER.info("Devices to remove (by ID): %s", devices_to_remove)
-        
-        for device_id in devices_to_remove:
+        # Removed devices
+        for device in delta.removed:
+            device_id = device.id
             sensor = device_sensors.pop(device_id, None)
             if sensor:
                 device_name = sensor._device_name
@@ -148,11 +131,13 @@ async def async_setup_entry(
             else:
                 _LOGGER.warning("Could not find sensor for device_id: %s", device_id)
     
-    # Register listener for coordinator updates
-    entry.async_on_unload(coordinator.async_add_listener(manage_device_sensors))
+    # Register listener for structural device list changes only
+    entry.async_on_unload(
+        coordinator.async_add_catalog_listener(CATALOG_DEVICES, manage_device_sensors)
+    )
 
 
-class HaptiqueRS90SensorBase(CoordinatorEntity, SensorEntity):
+class HaptiqueRS90SensorBase(HaptiqueRS90Entity, SensorEntity):
     """Base class for Haptique RS90 sensors."""
 
     def __init__(
@@ -197,10 +182,14 @@ class HaptiqueRS90BatterySensor(HaptiqueRS90SensorBase):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:battery"
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to."""
+        return [(CHANNEL_BATTERY, None)]
+
     @property
     def native_value(self) -> int | None:
         """Return the battery level."""
-        return self.coordinator.data.get("battery_level")
+        return self.coordinator.data.battery_level
 
     @property
     def icon(self) -> str:
@@ -242,10 +231,14 @@ class HaptiqueRS90LastKeySensor(HaptiqueRS90SensorBase):
         self._attr_name = "Last Key Pressed"
         self._attr_icon = "mdi:gesture-tap-button"
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to."""
+        return [(CHANNEL_KEYS, None)]
+
     @property
     def native_value(self) -> str | None:
         """Return the last key pressed."""
-        last_key = self.coordinator.data.get("last_key")
+        last_key = self.coordinator.data.last_key
         if last_key:
             return f"Button {last_key}"
         return None
@@ -253,7 +246,7 @@ class HaptiqueRS90LastKeySensor(HaptiqueRS90SensorBase):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
-        last_key = self.coordinator.data.get("last_key")
+        last_key = self.coordinator.data.last_key
         if last_key:
             return {"button_number": last_key}
         return {}
@@ -272,37 +265,43 @@ class HaptiqueRS90RunningMacroSensor(HaptiqueRS90SensorBase):
         self._attr_name = "Running Macro"
         self._attr_icon = "mdi:play-circle"
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to (all macros)."""
+        return [(CHANNEL_MACRO_STATE, None)]
+
     @property
     def native_value(self) -> str | None:
         """Return the running macro name or Idle."""
-        # Get the macro that has status "on"
-        macro_states = self.coordinator.data.get("macro_states", {})
-        for macro_name, state in macro_states.items():
-            if state == "on":
-                return macro_name
-        return "Idle"
+        active_macros = self.coordinator.data.active_macros
+        return active_macros[0] if active_macros else "Idle"
 
     @property
     def icon(self) -> str:
         """Return icon based on state."""
-        if self.native_value and self.native_value != "Idle":
+        if self.coordinator.data.active_macros:
             return "mdi:play-circle"  # Icône play quand actif (sera coloré par HA)
         return "mdi:circle-outline"  # Icône vide quand idle
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
-        macro_states = self.coordinator.data.get("macro_states", {})
-        return {
-            "macro_states": macro_states,
-            "active_macros": [name for name, state in macro_states.items() if state == "on"],
-        }
+        return self._memoized(
+            "attributes",
+            lambda: {
+                "macro_states": dict(self.coordinator.data.macro_states),
+                "active_macros": list(self.coordinator.data.active_macros),
+            },
+        )
 
 
 
 class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
     """Sensor for displaying commands of a specific device."""
 
+    # The full ID list is kept out of the recorder (command_N attributes can
+    # be dropped with the compact attributes option)
+    _unrecorded_attributes = frozenset({"commands"})
+
     def __init__(
         self,
         coordinator: HaptiqueRS90Coordinator,
@@ -311,11 +310,7 @@ class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
     ) -> None:
         """Initialize the device commands sensor."""
         # Store device ID for stable unique_id and rename detection
-        self._device_id = None
-        for device in coordinator.data.get("devices", []):
-            if device.get("name") == device_name:
-                self._device_id = device.get("id")
-                break
+        self._device_id = coordinator.data.devices.id_by_name.get(device_name)
         
         if not self._device_id:
             _LOGGER.warning("Could not find device_id for device: %s", device_name)
@@ -340,6 +335,11 @@ class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
         # Catégorie diagnostic pour grouper séparément dans l'interface
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to."""
+        # Without a stable ID, fall back to every commands update
+        return [(CHANNEL_COMMANDS, self._device_id)]
+
     @property
     def name(self) -> str:
         """Return the friendly name (updates on rename)."""
@@ -348,27 +348,17 @@ class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
     @property
     def native_value(self) -> int:
         """Return the number of commands for this device."""
-        commands = self.coordinator.data.get("device_commands", {}).get(self._device_name, [])
-        return len(commands)
+        return len(self.coordinator.data.device_commands.get(self._device_name, ()))
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return command IDs as attributes."""
-        commands = self.coordinator.data.get("device_commands", {}).get(self._device_name, [])
-        command_ids = [cmd.get("id") for cmd in commands if cmd.get("id")]
-        
-        attributes = {
+        return {
             "device_name": self._device_name,
             "rs90_device_id": self._device_id,  # Stable ID for service calls
-            "command_count": len(commands),
-            "commands": command_ids,  # List of all command IDs
+            # command_count, commands and command_N - cached until the catalog changes
+            **self.coordinator.get_command_attributes(self._device_name),
         }
-        
-        # Add each command as a separate attribute for easy access
-        for idx, cmd_id in enumerate(command_ids, 1):
-            attributes[f"command_{idx}"] = cmd_id
-        
-        return attributes
 
 
 
@@ -386,39 +376,28 @@ class RS90InfoSummarySensor(HaptiqueRS90SensorBase):
         self._attr_name = "Info Summary"
         self._attr_icon = "mdi:information-variant"
     
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to (devices and macros)."""
+        return [(CHANNEL_CATALOG, None)]
+    
     @property
     def native_value(self) -> str:
         """Return summary state."""
-        devices_count = len(self.coordinator.data.get("devices", []))
-        macros_count = len(self.coordinator.data.get("macros", []))
+        devices_count = len(self.coordinator.data.devices)
+        macros_count = len(self.coordinator.data.macros)
         return f"{devices_count} devices, {macros_count} macros"
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return all RS90 configuration information as attributes."""
-        from homeassistant.helpers import device_registry as dr
-        
-        # Get RS90 device info from Home Assistant device registry
-        device_registry = dr.async_get(self.hass)
-        rs90_device = device_registry.async_get_device(
-            identifiers={(DOMAIN, self._entry.data["remote_id"])}
-        )
-        
-        ha_device_id = rs90_device.id if rs90_device else "N/A"
-        
-        # Build devices dictionary with name as key, id as value
-        devices = self.coordinator.data.get("devices", [])
-        devices_dict = {}
-        for device in sorted(devices, key=lambda d: d.get("name", "").lower()):
-            if device.get("name") and device.get("id"):
-                devices_dict[device.get("name")] = device.get("id")
-        
-        # Build macros dictionary with name as key, id as value
-        macros = self.coordinator.data.get("macros", [])
-        macros_dict = {}
-        for macro in sorted(macros, key=lambda m: m.get("name", "").lower()):
-            if macro.get("name") and macro.get("id"):
-                macros_dict[macro.get("name")] = macro.get("id")
+        # Rebuilt only when the device or macro list changes
+        return self._memoized("attributes", self._build_attributes)
+
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the summary attributes."""
+        # Devices and macros with name as key, id as value (sorted by name)
+        devices_dict = dict(self.coordinator.data.devices.sorted_id_by_name)
+        macros_dict = dict(self.coordinator.data.macros.sorted_id_by_name)
         
         # RS90 info as individual attributes
         device_name = self._entry.data.get('name') or f"RS90 {self._entry.data['remote_id'][:8]}"
@@ -433,8 +412,108 @@ class RS90InfoSummarySensor(HaptiqueRS90SensorBase):
             "macros_count": len(macros_dict),
             
             # RS90 Remote info
-            "rs90_id": ha_device_id,  # HA Device ID for service calls
+            "rs90_id": self.coordinator.device_id or "N/A",  # HA Device ID for service calls
             "rs90_remote_id": self._entry.data['remote_id'],  # MQTT RemoteID
             "rs90_device_name": device_name,
         }
 
+
+class HaptiqueRS90MetricsSensorBase(HaptiqueRS90SensorBase):
+    """Base class for the performance metrics sensors.
+
+    Disabled by default and refreshed every METRICS_UPDATE_INTERVAL rather
+    than on every message, so enabling them adds no per-message state writes.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this sensor listens to."""
+        return [(CHANNEL_METRICS, None)]
+
+
+class HaptiqueRS90MessagesSensor(HaptiqueRS90MetricsSensorBase):
+    """Number of MQTT messages handled since startup."""
+
+    def __init__(
+        self,
+        coordinator: HaptiqueRS90Coordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the messages sensor."""
+        super().__init__(coordinator, entry, "metrics_messages")
+        self._attr_name = "MQTT Messages"
+        self._attr_icon = "mdi:message-processing"
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of handled messages."""
+        return self.coordinator.metrics.messages
+
+
+class HaptiqueRS90HandlerLatencySensor(HaptiqueRS90MetricsSensorBase):
+    """Average message handler latency since startup."""
+
+    def __init__(
+        self,
+        coordinator: HaptiqueRS90Coordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the handler latency sensor."""
+        super().__init__(coordinator, entry, "metrics_handler_latency")
+        self._attr_name = "Handler Latency"
+        self._attr_icon = "mdi:timer-outline"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the average handler latency."""
+        return self.coordinator.metrics.handler_latency.avg_ms
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the maximum latency and the over budget count."""
+        metrics = self.coordinator.metrics
+        return {
+            "max_ms": round(metrics.handler_latency.max * 1000, 3),
+            "latency_budget_ms": round(metrics.latency_budget * 1000, 3),
+            "over_budget": metrics.over_budget,
+        }
+
+
+class HaptiqueRS90PublishLatencySensor(HaptiqueRS90MetricsSensorBase):
+    """Average MQTT publish latency since startup."""
+
+    def __init__(
+        self,
+        coordinator: HaptiqueRS90Coordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the publish latency sensor."""
+        super().__init__(coordinator, entry, "metrics_publish_latency")
+        self._attr_name = "Publish Latency"
+        self._attr_icon = "mdi:timer-arrow-up-outline"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the average publish latency."""
+        return self.coordinator.metrics.publish_avg_ms
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the average latency per QoS and the failure count."""
+        metrics = self.coordinator.metrics
+        return {
+            **{
+                f"qos_{qos}_avg_ms": histogram.avg_ms
+                for qos, histogram in sorted(metrics.publish_latency.items())
+            },
+            "failures": metrics.publish_failures,
+        }
@@ -9,10 +9,17 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, CONF_REMOTE_ID
+from .const import (
+    DOMAIN,
+    CONF_REMOTE_ID,
+    CHANNEL_STATUS,
+    CHANNEL_MACRO_STATE,
+    CATALOG_MACROS,
+)
 from .coordinator import HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
+from .models import CatalogDelta
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,74 +35,54 @@ async def async_setup_entry(
     entities: dict[str, HaptiqueRS90MacroSwitch] = {}
     
     # Create switches for macros
-    for macro in coordinator.data.get("macros", []):
-        macro_id = macro.get("id")
-        macro_name = macro.get("name")
-        if macro_id and macro_name:
-            entity = HaptiqueRS90MacroSwitch(coordinator, entry, macro_id, macro_name)
-            entities[macro_id] = entity
+    for macro_name, macro_id in coordinator.data.macros.id_by_name.items():
+        entity = HaptiqueRS90MacroSwitch(coordinator, entry, macro_id, macro_name)
+        entities[macro_id] = entity
     
     async_add_entities(entities.values())
     
     @callback
-    def _async_update_entities() -> None:
-        """Add new entities and remove obsolete ones when macros change."""
+    def _async_update_entities(delta: CatalogDelta) -> None:
+        """Add, remove and rename the switches of the changed macros only."""
         _LOGGER.debug("=== SWITCH: Entity update triggered ===")
         entity_registry = er.async_get(hass)
-        current_macro_ids = {macro.get("id") for macro in coordinator.data.get("macros", []) if macro.get("id")}
-        existing_macro_ids = set(entities.keys())
         
-        _LOGGER.debug("Current macro IDs from MQTT: %s", current_macro_ids)
-        _LOGGER.debug("Existing macro IDs in HA: %s", existing_macro_ids)
+        added = list(delta.added)
         
-        # Check for renamed macros (same ID, different name)
-        for macro in coordinator.data.get("macros", []):
-            macro_id = macro.get("id")
-            macro_name = macro.get("name")
-            if macro_id in existing_macro_ids and macro_name:
-                entity = entities.get(macro_id)
-                if entity and entity._macro_name != macro_name:
-                    _LOGGER.info("RENAME: Macro renamed: '%s' → '%s' (id: %s)", 
-                                entity._macro_name, macro_name, macro_id)
-                    entity._macro_name = macro_name
-                    # Update friendly name in entity registry
-                    entity_reg = er.async_get(hass)
-                    if entity_entry := entity_reg.async_get(entity.entity_id):
-                        entity_reg.async_update_entity(
-                            entity.entity_id,
-                            name=f"Macro: {macro_name}"
-                        )
-                    # Force immediate state update
-                    entity.async_write_ha_state()
-                    entity.async_schedule_update_ha_state(force_refresh=True)
+        # Renamed macros (same ID, different name)
+        for old_macro, macro in delta.renamed:
+            entity = entities.get(macro.id)
+            if entity is None:
+                added.append(macro)  # No switch yet, create it under the new name
+                continue
+            _LOGGER.info("RENAME: Macro renamed: '%s' → '%s' (id: %s)", 
+                        old_macro.name, macro.name, macro.id)
+            entity._macro_name = macro.name
+            if entity.entity_id and entity_registry.async_get(entity.entity_id):
+                # Keep the registry name in sync; the registry update writes the state
+                entity_registry.async_update_entity(
+                    entity.entity_id,
+                    name=f"Macro: {macro.name}"
+                )
+            elif entity.hass is not None:
+                entity.async_write_ha_state()
         
-        # Find macros to add
-        macros_to_add = current_macro_ids - existing_macro_ids
+        # New macros
         new_entities = []
-        
-        if macros_to_add:
-            _LOGGER.info("Macros to add: %s", macros_to_add)
-        
-        for macro in coordinator.data.get("macros", []):
-            macro_id = macro.get("id")
-            macro_name = macro.get("name")
-            if macro_id in macros_to_add and macro_name:
-                entity = HaptiqueRS90MacroSwitch(coordinator, entry, macro_id, macro_name)
-                entities[macro_id] = entity
-                new_entities.append(entity)
-                _LOGGER.info("SUCCESS: Adding new macro switch: %s (id: %s)", macro_name, macro_id)
+        for macro in added:
+            if macro.id in entities:
+                continue
+            entity = HaptiqueRS90MacroSwitch(coordinator, entry, macro.id, macro.name)
+            entities[macro.id] = entity
+            new_entities.append(entity)
+            _LOGGER.info("SUCCESS: Adding new macro switch: %s (id: %s)", macro.name, macro.id)
         
         if new_entities:
             async_add_entities(new_entities)
         
-        # Find macros to remove
-        macros_to_remove = existing_macro_ids - current_macro_ids
-        
-        if macros_to_remove:
-            _LOGGER.info("Macros to remove: %s", macros_to_remove)
-        
-        for macro_id in macros_to_remove:
-            entity = entities.pop(macro_id, None)
+        # Removed macros
+        for macro in delta.removed:
+            entity = entities.pop(macro.id, None)
             if entity:
                 _LOGGER.debug("Processing removal of macro: %s (unique_id: %s)", entity.name, entity.unique_id)
                 # Remove from entity registry
@@ -110,13 +97,15 @@ async def async_setup_entry(
                 else:
                     _LOGGER.warning("Could not find entity_id for unique_id: %s", entity.unique_id)
             else:
-                _LOGGER.warning("Could not find entity for macro_id: %s", macro_id)
+                _LOGGER.warning("Could not find entity for macro_id: %s", macro.id)
     
-    # Setup dynamic entity management
-    entry.async_on_unload(coordinator.async_add_listener(_async_update_entities))
+    # Setup dynamic entity management (only on structural macro list changes)
+    entry.async_on_unload(
+        coordinator.async_add_catalog_listener(CATALOG_MACROS, _async_update_entities)
+    )
 
 
-class HaptiqueRS90SwitchBase(CoordinatorEntity, SwitchEntity):
+class HaptiqueRS90SwitchBase(HaptiqueRS90Entity, SwitchEntity):
     """Base class for Haptique RS90 switches."""
 
     def __init__(
@@ -142,10 +131,14 @@ class HaptiqueRS90SwitchBase(CoordinatorEntity, SwitchEntity):
             "identifiers": {(DOMAIN, entry.data[CONF_REMOTE_ID])},
         }
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this switch listens to."""
+        return [(CHANNEL_STATUS, None)]
+
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self.coordinator.data.get("status") == "online"
+        return self.coordinator.data.status == "online"
 
 
 class HaptiqueRS90MacroSwitch(HaptiqueRS90SwitchBase):
@@ -167,6 +160,10 @@ class HaptiqueRS90MacroSwitch(HaptiqueRS90SwitchBase):
         self._attr_icon = "mdi:play-circle"
         self._attr_device_class = "switch"
 
+    def _channels(self) -> list[tuple[str, str | None]]:
+        """Return the channels this switch listens to."""
+        return [*super()._channels(), (CHANNEL_MACRO_STATE, self._switch_id)]
+
     @property
     def name(self) -> str:
         """Return the friendly name (updates on rename)."""
@@ -175,9 +172,7 @@ class HaptiqueRS90MacroSwitch(HaptiqueRS90SwitchBase):
     @property
     def is_on(self) -> bool:
         """Return True if the macro is currently running."""
-        macro_states = self.coordinator.data.get("macro_states", {})
-        current_state = macro_states.get(self._macro_name, "off")
-        return current_state == "on"
+        return self.coordinator.data.macro_states.get(self._macro_name, "off") == "on"
 
     @property
     def icon(self) -> str:
@@ -187,8 +182,7 @@ class HaptiqueRS90MacroSwitch(HaptiqueRS90SwitchBase):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
-        macro_states = self.coordinator.data.get("macro_states", {})
-        current_state = macro_states.get(self._macro_name, "off")
+        current_state = self.coordinator.data.macro_states.get(self._macro_name, "off")
         return {
             "rs90_macro_id": self._switch_id,  # Stable ID for service calls
             "macro_name": self._macro_name,
@@ -0,0 +1,178 @@
+"""MQTT traffic recording and replay for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+import asyncio
+import base64
+from contextlib import nullcontext
+import gzip
+import json
+import logging
+from queue import SimpleQueue
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .models import MQTTMessage
+
+if TYPE_CHECKING:
+    from .coordinator import HaptiqueRS90Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+
+# Recorded message: (seconds since recording start, message with relative topic)
+Recording = list[tuple[float, MQTTMessage]]
+
+
+async def async_record(
+    hass: HomeAssistant, coordinator: HaptiqueRS90Coordinator, duration: float
+) -> str:
+    """Record every message of a remote for duration seconds.
+
+    The recording is a gzip file of JSON lines: a header, then one line per
+    message with its topic (relative to the remote base topic), payload,
+    QoS, retain flag and monotonic offset. Messages are streamed to the file
+    as they arrive by a writer running in the executor, so long recordings
+    are not kept in memory.
+
+    Returns:
+        Path of the written recording
+    """
+    prefix = f"{coordinator.base_topic}/"
+    path = hass.config.path(
+        f"{DOMAIN}_traffic_{coordinator.remote_id}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+    )
+    header = {
+        "version": RECORDING_VERSION,
+        "remote_id": coordinator.remote_id,
+        "started": dt_util.now().isoformat(),
+        "duration": duration,
+    }
+    # Messages handed to the writer, None ends the recording
+    messages: SimpleQueue[tuple[float, MQTTMessage] | None] = SimpleQueue()
+    writer = hass.async_add_executor_job(_write_recording, path, header, messages)
+    started = time.monotonic()
+
+    @callback
+    def message_received(msg) -> None:
+        """Record a message."""
+        messages.put(
+            (
+                time.monotonic() - started,
+                MQTTMessage(msg.topic.removeprefix(prefix), msg.payload, msg.qos, msg.retain),
+            )
+        )
+
+    try:
+        unsubscribe = await mqtt.async_subscribe(
+            hass, f"{coordinator.base_topic}/#", message_received, qos=0, encoding=None
+        )
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            unsubscribe()
+    finally:
+        messages.put(None)
+        count = await writer
+    _LOGGER.debug("Recorded %d messages to %s", count, path)
+    return path
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    coordinator: HaptiqueRS90Coordinator,
+    path: str,
+    speed: float,
+    isolated: bool = False,
+) -> int:
+    """Feed a recording into a coordinator.
+
+    Args:
+        speed: Replay speed factor (1 = original timing), 0 = as fast as possible
+        isolated: The coordinator is a test harness (benchmarks): any remote's
+                  recording is accepted and its effects are kept. Otherwise the
+                  recording must come from the same remote and is replayed in
+                  the coordinator replay mode (entities, snapshot and state are
+                  left as they were).
+
+    Returns:
+        Number of replayed messages
+
+    Raises:
+        ValueError: Recording of another remote, or a replay is already running
+    """
+    header, recording = await hass.async_add_executor_job(_read_recording, path)
+    if not isolated and header.get("remote_id") != coordinator.remote_id:
+        raise ValueError(
+            f"recording of remote {header.get('remote_id')} cannot be replayed "
+            f"into remote {coordinator.remote_id}"
+        )
+
+    with nullcontext() if isolated else coordinator.replay_mode():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for offset, message in recording:
+            delay = start + offset / speed - loop.time() if speed > 0 else 0
+            # Always yield so the work triggered by each message (subscription
+            # jobs, entity writes) interleaves like it does with a live broker
+            await asyncio.sleep(max(delay, 0))
+            coordinator.async_inject_message(
+                message.topic, message.payload, message.qos, message.retain
+            )
+    return len(recording)
+
+
+def _write_recording(
+    path: str, header: dict, messages: SimpleQueue[tuple[float, MQTTMessage] | None]
+) -> int:
+    """Write the recorded messages until None is received (runs in the executor).
+
+    Returns:
+        Number of written messages
+    """
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as output:
+        output.write(json.dumps(header, separators=(",", ":")) + "\n")
+        while (item := messages.get()) is not None:
+            offset, message = item
+            line = {
+                "t": round(offset, 6),
+                "topic": message.topic,
+                "qos": message.qos,
+                "retain": message.retain,
+            }
+            try:
+                line["payload"] = message.payload.decode("utf-8")
+            except UnicodeDecodeError:
+                line["payload_b64"] = base64.b64encode(message.payload).decode("ascii")
+            output.write(json.dumps(line, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def _read_recording(path: str) -> tuple[dict, Recording]:
+    """Read a recording and its header (runs in the executor)."""
+    header: dict = {}
+    recording: Recording = []
+    with gzip.open(path, "rt", encoding="utf-8") as recording_file:
+        for raw_line in recording_file:
+            line = json.loads(raw_line)
+            if "topic" not in line:
+                header = line
+                continue
+            if "payload_b64" in line:
+                payload = base64.b64decode(line["payload_b64"])
+            else:
+                payload = line["payload"].encode("utf-8")
+            recording.append(
+                (
+                    line["t"],
+                    MQTTMessage(line["topic"], payload, line["qos"], line["retain"]),
+                )
+            )
+    return header, recording